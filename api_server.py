@@ -3,14 +3,23 @@ FastAPI веб-сервис для ИИ-Агента GOST Formatter
 Обрабатывает запросы от фронтенда и возвращает отформатированные записи
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Optional
+from functools import partial
+import hashlib
+import logging
 import os
 import json
+import sqlite3
+import threading
+import time
+
+import anyio.to_thread
+import orjson
 
 # ВАЖНО: Сначала импортируем классы агента
 from gost_formatter_agent import (
@@ -23,6 +32,8 @@ from gost_formatter_agent import (
 # Импорт модуля для внешних API (CrossRef, Open Library)
 from metadata_lookup import get_metadata_lookup, MetadataResult
 
+logger = logging.getLogger("gost_api")
+
 # Инициализация FastAPI
 app = FastAPI(
     title="GOST Formatter API",
@@ -49,6 +60,51 @@ else:
 
 agent = GOSTFormatterAgent(api_key=api_key)
 
+# Флаг наличия ключа вычисляется один раз при старте, а не на каждый
+# пробный запрос балансировщика к /api/health
+_API_KEY_SET = bool(api_key)
+
+# Ответы / и /api/health не меняются после старта — сериализуем один раз
+# и отдаём готовые байты без pydantic/jsonable_encoder на каждый запрос
+_HTML_PATH = os.path.join(os.path.dirname(__file__), "index.html")
+_HAS_INDEX = os.path.exists(_HTML_PATH)
+
+_ROOT_BYTES = orjson.dumps({
+    "service": "GOST Formatter API",
+    "version": "1.0.0",
+    "status": "running",
+    "endpoints": {
+        "health": "/api/health",
+        "format_single": "/api/format/single",
+        "format_batch": "/api/format/batch",
+        "parse": "/api/parse",
+        "stats": "/api/stats",
+        "docs": "/docs"
+    }
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "ok",
+    "service": "GOST Formatter",
+    "api_key_set": _API_KEY_SET
+})
+
+# Резолвинг стандарта без ветвления в хэндлерах
+_STD_MAP = {s.value: s for s in Standard}
+
+
+def _resolve_standard(name: str) -> Standard:
+    standard = _STD_MAP.get(name)
+    if standard is None:
+        raise HTTPException(status_code=400, detail=f"Неизвестный стандарт: {name}")
+    return standard
+
+
+@app.on_event("startup")
+async def configure_thread_pool():
+    """Расширяет пул потоков для синхронных вызовов агента"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 32
+
 
 # ==================== МОДЕЛИ ДАННЫХ ====================
 
@@ -107,38 +163,100 @@ class BatchFormatResponse(BaseModel):
     processing_time: float
 
 
+# ==================== КЭШ РЕЗУЛЬТАТОВ ====================
+
+class FormatCache:
+    """Персистентный LRU-кэш результатов форматирования (sqlite)
+
+    Ключ — хэш от (данные источника, стандарт). Попадание в кэш полностью
+    пропускает обращение к Claude для повторяющихся записей.
+    """
+
+    def __init__(self, path: str = ".gost_cache.sqlite3", max_entries: int = 10000):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS format_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM format_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE format_cache SET used_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO format_cache (key, value, used_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            # Вытесняем наименее используемые записи сверх лимита
+            self._conn.execute(
+                "DELETE FROM format_cache WHERE key IN ("
+                "SELECT key FROM format_cache ORDER BY used_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self._max_entries,)
+            )
+            self._conn.commit()
+
+
+format_cache = FormatCache()
+
+
+def _cache_key(source: "SourceRequest", standard: str, original_text: str = "") -> str:
+    # id в ключе не участвует: одна и та же запись под разными номерами
+    # списка должна попадать в одну запись кэша
+    data = {k: v for k, v in source.__dict__.items() if k != "id"}
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(
+        f"{payload}|{standard}|{original_text}".encode(), digest_size=16
+    ).hexdigest()
+
+
+# ==================== КОНВЕРТАЦИЯ ====================
+
+def _to_format_response(r: FormattedResult) -> FormatResponse:
+    """Конвертирует FormattedResult в FormatResponse без повторной валидации.
+
+    Данные приходят от агента и уже типизированы, поэтому используем
+    model_construct (пропускает pydantic-валидацию).
+    """
+    return FormatResponse.model_construct(
+        id=r.id,
+        original=r.original,
+        formatted=r.formatted,
+        errors_fixed=r.errors_fixed,
+        confidence=r.confidence,
+        standard_used=r.standard_used.value
+    )
+
+
 # ==================== ЭНДПОИНТЫ ====================
 
 @app.get("/")
 async def root():
     """Главная страница - веб-интерфейс"""
-    html_path = os.path.join(os.path.dirname(__file__), "index.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
+    if _HAS_INDEX:
+        return FileResponse(_HTML_PATH)
     # Fallback to JSON if HTML not found
-    return {
-        "service": "GOST Formatter API",
-        "version": "1.0.0",
-        "status": "running",
-        "endpoints": {
-            "health": "/api/health",
-            "format_single": "/api/format/single",
-            "format_batch": "/api/format/batch",
-            "parse": "/api/parse",
-            "stats": "/api/stats",
-            "docs": "/docs"
-        }
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/api/health")
 async def health_check():
     """Проверка работоспособности сервиса"""
-    return {
-        "status": "ok",
-        "service": "GOST Formatter",
-        "api_key_set": bool(os.getenv("ANTHROPIC_API_KEY"))
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get("/api/lookup/{identifier}")
@@ -197,123 +315,163 @@ async def lookup_by_isbn(isbn: str):
 @app.post("/api/format/single", response_model=FormatResponse)
 async def format_single_source(request: SingleFormatRequest):
     """Форматирует один библиографический источник"""
+    # Определяем стандарт (ранняя валидация, 400 при неизвестном значении)
+    standard = _resolve_standard(request.standard)
+
     try:
-        # Конвертируем в Source (с дефолтами для None значений)
-        source = Source(
-            id=request.source.id or 1,
-            type=request.source.type or "book",
-            authors=request.source.authors or [],
-            title=request.source.title or "",
-            year=request.source.year or 0,
-            publisher=request.source.publisher,
-            city=request.source.city,
-            pages=request.source.pages,
-            journal=request.source.journal,
-            volume=request.source.volume,
-            issue=request.source.issue,
-            doi=request.source.doi,
-            url=request.source.url,
-            language=request.source.language or "ru"
-        )
+        # Проверяем кэш — повторные записи не требуют обращения к Claude
+        cache_key = _cache_key(request.source, request.standard, request.original_text or "")
+        # sqlite-кэш — синхронный дисковый I/O: уводим в пул потоков,
+        # чтобы не блокировать event loop
+        cached = await anyio.to_thread.run_sync(format_cache.get, cache_key)
+        if cached is not None:
+            # Ключ не зависит от id — проставляем id текущего запроса
+            cached["id"] = request.source.id or 1
+            return ORJSONResponse(cached)
 
-        # Определяем стандарт
-        standard = Standard.GOST_2018 if request.standard == "GOST_2018" else Standard.VAK_RB
+        # Конвертируем в Source (с дефолтами для None значений)
+        data = dict(request.source.__dict__)
+        data["id"] = data["id"] or 1
+        data["type"] = data["type"] or "book"
+        data["authors"] = data["authors"] or []
+        data["title"] = data["title"] or ""
+        data["year"] = data["year"] or 0
+        data["language"] = data["language"] or "ru"
+        source = Source(**data)
 
         # Форматируем (передаём оригинальный текст для сверки)
-        result = agent.format_single(source, standard, original_text=request.original_text or "")
-
-        return FormatResponse(
-            id=result.id,
-            original=result.original,
-            formatted=result.formatted,
-            errors_fixed=result.errors_fixed,
-            confidence=result.confidence,
-            standard_used=result.standard_used.value
+        # Синхронный вызов агента уводим в пул потоков, чтобы не блокировать event loop
+        result = await anyio.to_thread.run_sync(
+            partial(agent.format_single, source, standard, original_text=request.original_text or "")
         )
 
+        response = _to_format_response(result).model_dump()
+        await anyio.to_thread.run_sync(format_cache.set, cache_key, response)
+        # Отдаём готовый dict через ORJSONResponse: C-сериализация без
+        # повторной pydantic-валидации response_model
+        return ORJSONResponse(response)
+
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ ОШИБКА ФОРМАТИРОВАНИЯ: {str(e)}")
-        print(f"Traceback:\n{error_trace}")
+        logger.exception("Ошибка форматирования")
         raise HTTPException(status_code=500, detail=f"Ошибка форматирования: {str(e)}")
 
 
 @app.post("/api/format/batch", response_model=BatchFormatResponse)
 async def format_batch_sources(request: BatchFormatRequest):
     """Форматирует пакет источников"""
-    import time
+    # Определяем стандарт (ранняя валидация, 400 при неизвестном значении)
+    standard = _resolve_standard(request.standard)
 
     try:
         start_time = time.time()
 
-        # Конвертируем в Source
-        sources = [
-            Source(
-                id=s.id,
-                type=s.type,
-                authors=s.authors,
-                title=s.title,
-                year=s.year,
-                publisher=s.publisher,
-                city=s.city,
-                pages=s.pages,
-                journal=s.journal,
-                volume=s.volume,
-                issue=s.issue,
-                doi=s.doi,
-                url=s.url,
-                language=s.language
+        # Разделяем источники на закэшированные и требующие форматирования.
+        # Сшиваем по позиции, а не по id: модель может перенумеровать
+        # источники, а клиентские id не обязаны быть уникальными.
+        # Опрос sqlite-кэша — синхронный дисковый I/O, поэтому вся
+        # раскладка выполняется в пуле потоков, не блокируя event loop
+        def _partition():
+            responses: list = [None] * len(request.sources)
+            uncached = []
+            for pos, s in enumerate(request.sources):
+                key = _cache_key(s, request.standard)
+                hit = format_cache.get(key)
+                if hit is not None:
+                    # Ключ не зависит от id — проставляем id текущего источника
+                    hit["id"] = s.id
+                    responses[pos] = hit
+                else:
+                    uncached.append((pos, key, s))
+            return responses, uncached
+
+        responses_by_pos, uncached_requests = await anyio.to_thread.run_sync(_partition)
+
+        # Форматируем асинхронно только незакэшированную часть
+        if uncached_requests:
+            # Поля SourceRequest и Source совпадают 1:1 — распаковываем
+            # __dict__ валидированной модели без поэлементного копирования
+            sources = [Source(**s.__dict__) for _, _, s in uncached_requests]
+            results = await agent.format_batch_async(
+                sources,
+                standard,
+                batch_size=request.batch_size,
+                max_concurrent=5
             )
-            for s in request.sources
-        ]
 
-        # Определяем стандарт
-        standard = Standard.GOST_2018 if request.standard == "GOST_2018" else Standard.VAK_RB
+            # Агент возвращает результаты в порядке входных источников.
+            # При расхождении числа результатов пары ненадёжны: отдаём
+            # что есть, но в кэш не пишем, чтобы не закрепить результат
+            # под чужим ключом
+            cacheable = len(results) == len(uncached_requests)
+            if not cacheable:
+                logger.warning(
+                    "Батч вернул %d результатов на %d источников — запись в кэш пропущена",
+                    len(results), len(uncached_requests)
+                )
+            to_cache = []
+            for (pos, key, _), r in zip(uncached_requests, results):
+                response = _to_format_response(r).model_dump()
+                responses_by_pos[pos] = response
+                if cacheable:
+                    to_cache.append((key, response))
+
+            # Запись в sqlite — тоже в пуле потоков, одной пачкой
+            if to_cache:
+                def _store():
+                    for key, response in to_cache:
+                        format_cache.set(key, response)
+
+                await anyio.to_thread.run_sync(_store)
+
+        processing_time = time.time() - start_time
+
+        formatted_results = [r for r in responses_by_pos if r is not None]
+
+        # Отдаём готовые dict'ы через ORJSONResponse: C-сериализация без
+        # повторной pydantic-валидации response_model
+        return ORJSONResponse({
+            "results": formatted_results,
+            "total": len(formatted_results),
+            "success": len(formatted_results),
+            "processing_time": round(processing_time, 2)
+        })
 
-        # Форматируем асинхронно
-        results = await agent.format_batch_async(
+    except Exception as e:
+        logger.exception("Ошибка пакетного форматирования")
+        raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
+
+
+@app.post("/api/format/batch/stream")
+async def format_batch_sources_stream(request: BatchFormatRequest):
+    """Пакетное форматирование с потоковой отдачей результатов (NDJSON)
+
+    Результаты отдаются построчно по мере готовности батчей: клиент
+    получает первый байт раньше, а сервер не держит весь список в памяти.
+    """
+    standard = _resolve_standard(request.standard)
+    sources = [Source(**s.__dict__) for s in request.sources]
+
+    async def generate():
+        async for r in agent.format_batch_async_iter(
             sources,
             standard,
             batch_size=request.batch_size,
             max_concurrent=5
-        )
-
-        processing_time = time.time() - start_time
-
-        # Конвертируем результаты
-        formatted_results = [
-            FormatResponse(
-                id=r.id,
-                original=r.original,
-                formatted=r.formatted,
-                errors_fixed=r.errors_fixed,
-                confidence=r.confidence,
-                standard_used=r.standard_used.value
+        ):
+            line = json.dumps(
+                _to_format_response(r).model_dump(), ensure_ascii=False
             )
-            for r in results
-        ]
-
-        return BatchFormatResponse(
-            results=formatted_results,
-            total=len(formatted_results),
-            success=len(formatted_results),
-            processing_time=round(processing_time, 2)
-        )
+            yield line + "\n"
 
-    except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ ОШИБКА ПАКЕТНОГО ФОРМАТИРОВАНИЯ: {str(e)}")
-        print(f"Traceback:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @app.post("/api/parse")
 async def parse_unstructured_text(request: TextParseRequest):
     """Парсит неструктурированный текст"""
     try:
-        sources = agent.parse_unstructured_text(request.text)
+        # Синхронный вызов агента уводим в пул потоков, чтобы не блокировать event loop
+        sources = await anyio.to_thread.run_sync(agent.parse_unstructured_text, request.text)
 
         return {
             "success": True,
@@ -335,10 +493,7 @@ async def parse_unstructured_text(request: TextParseRequest):
         }
 
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ ОШИБКА ПАРСИНГА: {str(e)}")
-        print(f"Traceback:\n{error_trace}")
+        logger.exception("Ошибка парсинга")
         raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
 
 
@@ -354,19 +509,16 @@ async def get_statistics():
 if __name__ == "__main__":
     import uvicorn
 
-    print("=" * 60)
-    print("GOST Formatter API Server")
-    print("=" * 60)
-    print("\n✅ Запуск сервера на http://localhost:8000")
-    print("\n📍 Доступные эндпоинты:")
-    print("  GET  /                      - Информация об API")
-    print("  GET  /api/health            - Проверка работоспособности")
-    print("  POST /api/format/single     - Форматирование одного источника")
-    print("  POST /api/format/batch      - Пакетное форматирование")
-    print("  POST /api/parse             - Парсинг текста")
-    print("  GET  /api/stats             - Статистика")
-    print("\n📚 Документация: http://localhost:8000/docs")
-    print("=" * 60)
-    print()
-
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
+    print("GOST Formatter API Server — http://localhost:8000 (docs: /docs)")
+
+    # uvloop + httptools (входят в uvicorn[standard]) заметно быстрее
+    # дефолтного selector-цикла; access-лог в stdout отключаем — это
+    # синхронная запись на каждый запрос
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        access_log=False
+    )
@@ -4,18 +4,64 @@ Final cleanup for VAK RB bibliography dataset.
 Fixes remaining punctuation issues.
 """
 
-import json
+import orjson
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+# All independent cleanup rules fused into one alternation so each record is
+# scanned once instead of once per rule. Every alternative is a named group;
+# _dispatch picks the replacement by which group matched.
+
+_MASTER_PAT = re.compile(
+    # 1. Double periods (journal names etc.)
+    r'(?P<journ>журн\.\.)'
+    r'|(?P<dperiod>(?P<dp_a>[а-яё])\.\.(?P<dp_b>[^.]))'
+    # 3/11. ". –X" -> ". – X" (space after dash, except for digits/ranges)
+    r'|(?P<dash>\. –(?P<da>[^\s\d–]))'
+    # 4. ":X" -> ": X" (but not in URLs like http://)
+    r'|(?P<colon>:(?P<co>[А-ЯЁа-яёA-Za-z]))'
+    # 5/6. No spaces around dash in numeric ranges (incl. "С. X – Y")
+    r'|(?P<range>(?P<rg_a>\d) ?– ?(?P<rg_b>\d))'
+    # 7. Missing space after initials before surname
+    r'|(?P<initials>(?P<in_a>\w\. \w\.)(?P<in_b>[А-ЯЁA-Z]))'
+    # 8. "№X" -> "№ X"
+    r'|(?P<numsign>№(?P<ns>[А-ЯЁа-яёA-Za-z0-9]))'
+    # 9. "Т.X" -> "Т. X", "Вып.X" -> "Вып. X", "кн.X" -> "кн. X"
+    r'|(?P<abbr>(?P<ab_w>Т|Вып|кн)\.(?P<ab_d>\d))'
+)
+
+_RULE_REPLACEMENTS = {
+    'journ': lambda m: 'журн.',
+    'dperiod': lambda m: f"{m.group('dp_a')}.{m.group('dp_b')}",
+    'dash': lambda m: f". – {m.group('da')}",
+    'colon': lambda m: f": {m.group('co')}",
+    'range': lambda m: f"{m.group('rg_a')}–{m.group('rg_b')}",
+    'initials': lambda m: f"{m.group('in_a')} {m.group('in_b')}",
+    'numsign': lambda m: f"№ {m.group('ns')}",
+    'abbr': lambda m: f"{m.group('ab_w')}. {m.group('ab_d')}",
+}
+
+# Which outer rule group matched, by group index (inner groups are skipped)
+_RULE_INDICES = [
+    (_MASTER_PAT.groupindex[name], repl) for name, repl in _RULE_REPLACEMENTS.items()
+]
+
+
+def _dispatch(m: re.Match) -> str:
+    for idx, repl in _RULE_INDICES:
+        if m.group(idx) is not None:
+            return repl(m)
+    return m.group(0)
 
 
 def load_dataset(filepath: str) -> dict:
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
 
 
-def save_dataset(data: dict, filepath: str):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_dataset(data: dict, filepath: str) -> None:
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 
 
 def clean_text(text: str) -> str:
@@ -25,44 +71,16 @@ def clean_text(text: str) -> str:
     ELLIPSIS_PLACEHOLDER = "<<<ELLIPSIS>>>"
     text = text.replace(". ... ", f". {ELLIPSIS_PLACEHOLDER} ")
 
-    # 1. Fix double periods (journal names etc.)
-    text = re.sub(r'журн\.\.', 'журн.', text)
-    text = re.sub(r'([а-яё])\.\.([^.])', r'\1.\2', text)
+    # Fixed-string rules go through C-level str.replace — cheaper than the
+    # regex engine for literal patterns
+    while '  ' in text:  # 2. Double spaces
+        text = text.replace('  ', ' ')
+    text = text.replace(' .', '.')  # 10. Trailing space before period
+    text = text.replace(' ,', ',')  # 10. Trailing space before comma
 
-    # 2. Fix double spaces
-    text = re.sub(r'  +', ' ', text)
-
-    # 3. Fix ". –X" -> ". – X" (space after dash, except for digits/ranges)
-    text = re.sub(r'\. –([А-ЯЁа-яёA-Za-z])', r'. – \1', text)
-
-    # 4. Fix ":X" -> ": X" (but not in URLs like http://)
-    text = re.sub(r':([А-ЯЁа-яёA-Za-z])', r': \1', text)
-
-    # 5. Ensure no spaces around dash in numeric ranges
-    text = re.sub(r'(\d) – (\d)', r'\1–\2', text)
-    text = re.sub(r'(\d)– (\d)', r'\1–\2', text)
-    text = re.sub(r'(\d) –(\d)', r'\1–\2', text)
-
-    # 6. Fix page ranges "С. X – Y" -> "С. X–Y"
-    text = re.sub(r'С\. (\d+) ?– ?(\d+)', r'С. \1–\2', text)
-
-    # 7. Fix missing space after initials before surname
-    text = re.sub(r'(\w\. \w\.)([А-ЯЁA-Z])', r'\1 \2', text)
-
-    # 8. Fix "№X" -> "№ X"
-    text = re.sub(r'№([А-ЯЁа-яёA-Za-z0-9])', r'№ \1', text)
-
-    # 9. Fix "Т.X" -> "Т. X" and "Вып.X" -> "Вып. X"
-    text = re.sub(r'Т\.(\d)', r'Т. \1', text)
-    text = re.sub(r'Вып\.(\d)', r'Вып. \1', text)
-    text = re.sub(r'кн\.(\d)', r'кн. \1', text)
-
-    # 10. Fix trailing spaces before punctuation
-    text = re.sub(r' \.', '.', text)
-    text = re.sub(r' ,', ',', text)
-
-    # 11. Ensure proper spacing around " – " separators (not in ranges)
-    text = re.sub(r'\. –([^\s\d–])', r'. – \1', text)
+    # Single pass over the text: the master alternation finds whichever rule
+    # matches first and _dispatch produces its replacement
+    text = _MASTER_PAT.sub(_dispatch, text)
 
     # Restore dissertation ellipsis
     text = text.replace(ELLIPSIS_PLACEHOLDER, "...")
@@ -70,18 +88,22 @@ def clean_text(text: str) -> str:
     return text
 
 
-def main():
+def main() -> None:
     print("Loading dataset...")
     dataset = load_dataset('vak_training.json')
 
-    print(f"Processing {len(dataset['examples'])} examples...")
+    examples = dataset['examples']
+    print(f"Processing {len(examples)} examples...")
 
-    cleaned_count = 0
-    for ex in dataset['examples']:
-        original = ex['example']
-        cleaned = clean_text(original)
+    # Записи независимы, а clean_text — чистый CPU: раскидываем по
+    # процессам (clean_text и его паттерны на уровне модуля — пиклится)
+    texts = [ex['example'] for ex in examples]
+    with ProcessPoolExecutor() as executor:
+        cleaned_texts = list(executor.map(clean_text, texts, chunksize=256))
 
-        if original != cleaned:
+    cleaned_count = 0
+    for ex, cleaned in zip(examples, cleaned_texts):
+        if ex['example'] != cleaned:
             cleaned_count += 1
             ex['example'] = cleaned
 
@@ -5,11 +5,12 @@
 сохраняя ТОЧНУЮ структуру и пунктуацию.
 """
 
-import json
+import orjson
 import random
 import re
 import hashlib
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
 # =============================================
@@ -114,25 +115,51 @@ FIELDS = [
 # ФУНКЦИИ ГЕНЕРАЦИИ
 # =============================================
 
+class _BatchSampler:
+    """Пакетный источник случайных значений
+
+    Пополняется блоками одним вызовом random.choices (C-уровень) вместо
+    отдельного обращения к RNG на каждое значение в горячем цикле expand().
+    """
+
+    def __init__(self, population, batch_size: int = 1024) -> None:
+        self._population = population
+        self._batch_size = batch_size
+        self._values: list = []
+
+    def next(self):
+        if not self._values:
+            self._values = random.choices(self._population, k=self._batch_size)
+        return self._values.pop()
+
+
+_SURNAME_POOL = _BatchSampler(SURNAMES)
+_INITIALS_POOL = _BatchSampler(INITIALS)
+_YEAR_POOL = _BatchSampler(range(2015, 2026))
+_PAGES_POOL = _BatchSampler(range(80, 501))
+_RANGE_START_POOL = _BatchSampler(range(5, 201))
+_RANGE_LEN_POOL = _BatchSampler(range(5, 31))
+_VOLUME_POOL = _BatchSampler(range(1, 51))
+_ISSUE_POOL = _BatchSampler(range(1, 13))
+
+
 def random_author() -> str:
     """Генерирует случайного автора в формате Фамилия, И. О."""
-    return f"{random.choice(SURNAMES)}, {random.choice(INITIALS)}"
+    return f"{_SURNAME_POOL.next()}, {_INITIALS_POOL.next()}"
 
 def random_author_full() -> str:
     """Генерирует автора в формате И. О. Фамилия"""
-    initials = random.choice(INITIALS)
-    surname = random.choice(SURNAMES)
-    return f"{initials} {surname}"
+    return f"{_INITIALS_POOL.next()} {_SURNAME_POOL.next()}"
 
-def random_year(min_year: int = 2015, max_year: int = 2025) -> int:
-    return random.randint(min_year, max_year)
+def random_year() -> int:
+    return _YEAR_POOL.next()
 
 def random_pages() -> str:
-    return str(random.randint(80, 500))
+    return str(_PAGES_POOL.next())
 
 def random_page_range() -> str:
-    start = random.randint(5, 200)
-    end = start + random.randint(5, 30)
+    start = _RANGE_START_POOL.next()
+    end = start + _RANGE_LEN_POOL.next()
     return f"{start}–{end}"
 
 def random_publisher(country: str = "BY") -> str:
@@ -146,23 +173,64 @@ def random_city(country: str = "BY") -> str:
     return random.choice(CITIES_RU)
 
 def random_volume() -> str:
-    return str(random.randint(1, 50))
+    return str(_VOLUME_POOL.next())
 
 def random_issue() -> str:
-    return str(random.randint(1, 12))
+    return str(_ISSUE_POOL.next())
 
 def gen_id(text: str, idx: int) -> str:
-    return hashlib.md5(f"{text[:30]}_{idx}".encode()).hexdigest()[:12]
+    # blake2b с 6-байтовым дайджестом заметно быстрее md5 на коротких
+    # строках и даёт те же 12 hex-символов идентификатора
+    return hashlib.blake2b(f"{text[:30]}_{idx}".encode(), digest_size=6).hexdigest()
 
 
 class DatasetExpander:
     """Расширитель датасета на основе паттернов"""
-    
-    def __init__(self, original_dataset_path: str):
-        with open(original_dataset_path, 'r', encoding='utf-8') as f:
-            self.original = json.load(f)
+
+    # Предкомпилированные паттерны (один раз на класс, а не на запись)
+    _YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+    _PAGES_RE = re.compile(r'(\d{2,3})\s*с\.')
+    _RANGE_RE = re.compile(r'С\.\s*\d+[–—-]\d+')
+    _VOL_RE = re.compile(r'Т\.\s*\d+')
+    _ISSUE_RE = re.compile(r'№\s*\d+')
+    _AUTHOR_RE = re.compile(r'([А-ЯЁA-Z][а-яёa-z]+),\s+([А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.?)')
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _author_replacement_re(surnames: Tuple[str, ...]) -> re.Pattern:
+        """Единый паттерн замены авторов (обе формы) для набора фамилий
+
+        Одна альтернация по всем фамилиям → один линейный проход по тексту
+        вместо двух re.sub на каждую фамилию. Компиляция мемоизируется:
+        вариации одной записи переиспользуют готовый паттерн.
+        """
+        alt = "|".join(re.escape(s) for s in surnames)
+        return re.compile(
+            rf'(?P<inv_surname>{alt}),\s+[А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.?'
+            rf'|[А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.\s*(?P<dir_surname>{alt})'
+        )
+
+    def __init__(self, original_dataset_path: str) -> None:
+        with open(original_dataset_path, 'rb') as f:
+            self.original = orjson.loads(f.read())
         
-        self.records = self.original.get('records', [])
+        raw_records = self.original.get('records', [])
+
+        # Дедупликация по formatted_output: реальные выгрузки ВАК содержат
+        # повторы, а каждая лишняя запись — лишние regex-проходы в expand()
+        seen = set()
+        self.records = []
+        for r in raw_records:
+            h = hashlib.blake2b(
+                r.get('formatted_output', '').encode(), digest_size=8
+            ).digest()
+            if h not in seen:
+                seen.add(h)
+                self.records.append(r)
+
+        if len(self.records) < len(raw_records):
+            print(f"Дедупликация: {len(raw_records)} → {len(self.records)} записей")
+
         self.expanded = []
         self.idx = 0
     
@@ -175,68 +243,66 @@ class DatasetExpander:
         new_formatted = formatted
         
         # 1. Заменяем года
-        years = re.findall(r'\b(19|20)\d{2}\b', new_formatted)
+        years = self._YEAR_RE.findall(new_formatted)
         for year in years:
             new_year = str(random_year())
             new_formatted = new_formatted.replace(year, new_year, 1)
-        
+
         # 2. Заменяем количество страниц (XXX с.)
-        page_match = re.search(r'(\d{2,3})\s*с\.', new_formatted)
+        page_match = self._PAGES_RE.search(new_formatted)
         if page_match:
             new_formatted = new_formatted.replace(
-                page_match.group(0), 
+                page_match.group(0),
                 f"{random_pages()} с."
             )
-        
+
         # 3. Заменяем диапазон страниц (С. XX–YY)
-        range_match = re.search(r'С\.\s*\d+[–—-]\d+', new_formatted)
+        range_match = self._RANGE_RE.search(new_formatted)
         if range_match:
             new_formatted = new_formatted.replace(
                 range_match.group(0),
                 f"С. {random_page_range()}"
             )
-        
+
         # 4. Заменяем том (Т. X)
-        vol_match = re.search(r'Т\.\s*\d+', new_formatted)
+        vol_match = self._VOL_RE.search(new_formatted)
         if vol_match:
             new_formatted = new_formatted.replace(
                 vol_match.group(0),
                 f"Т. {random_volume()}"
             )
-        
+
         # 5. Заменяем номер (№ X)
-        issue_match = re.search(r'№\s*\d+', new_formatted)
+        issue_match = self._ISSUE_RE.search(new_formatted)
         if issue_match:
             new_formatted = new_formatted.replace(
                 issue_match.group(0),
                 f"№ {random_issue()}"
             )
-        
+
         # 6. Заменяем авторов (Фамилия, И. О.)
-        author_pattern = r'([А-ЯЁA-Z][а-яёa-z]+),\s+([А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.?)'
-        authors_found = re.findall(author_pattern, new_formatted)
-        
+        authors_found = self._AUTHOR_RE.findall(new_formatted)
+
         author_mapping = {}
         for surname, initials in authors_found:
             if surname not in author_mapping:
-                new_surname = random.choice(SURNAMES)
-                new_initials = random.choice(INITIALS)
-                author_mapping[surname] = (new_surname, new_initials)
-        
-        for old_surname, (new_surname, new_initials) in author_mapping.items():
-            # Заменяем "Фамилия, И. О."
-            new_formatted = re.sub(
-                rf'{old_surname},\s+[А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.?',
-                f'{new_surname}, {new_initials}',
-                new_formatted
-            )
-            # Заменяем "И. О. Фамилия"
-            new_formatted = re.sub(
-                rf'[А-ЯЁA-Z]\.\s*[А-ЯЁA-Z]?\.\s*{old_surname}',
-                f'{new_initials} {new_surname}',
-                new_formatted
-            )
-        
+                author_mapping[surname] = (_SURNAME_POOL.next(), _INITIALS_POOL.next())
+
+        if author_mapping:
+            # Обе формы ("Фамилия, И. О." и "И. О. Фамилия") заменяются
+            # одним линейным проходом по тексту
+            combined_re = self._author_replacement_re(tuple(sorted(author_mapping)))
+
+            def _replace_author(m):
+                surname = m.group('inv_surname')
+                if surname is not None:
+                    new_surname, new_initials = author_mapping[surname]
+                    return f"{new_surname}, {new_initials}"
+                new_surname, new_initials = author_mapping[m.group('dir_surname')]
+                return f"{new_initials} {new_surname}"
+
+            new_formatted = combined_re.sub(_replace_author, new_formatted)
+
         return {
             'id': gen_id(new_formatted, self.idx),
             'source_type': source_type,
@@ -296,7 +362,7 @@ class DatasetExpander:
         
         return self.expanded
     
-    def save(self, output_path: str, records: List[Dict]):
+    def save(self, output_path: str, records: List[Dict]) -> Dict:
         """Сохраняет расширенный датасет"""
         # Считаем статистику
         type_stats = {}
@@ -311,22 +377,29 @@ class DatasetExpander:
             else:
                 originals += 1
         
-        dataset = {
-            'metadata': {
-                'source': 'vak.gov.by + generated variations',
-                'generated_at': datetime.now().isoformat(),
-                'total_records': len(records),
-                'original_records': originals,
-                'generated_variations': variations,
-                'type_distribution': type_stats
-            },
-            'records': records
+        metadata = {
+            'source': 'vak.gov.by + generated variations',
+            'generated_at': datetime.now().isoformat(),
+            'total_records': len(records),
+            'original_records': originals,
+            'generated_variations': variations,
+            'type_distribution': type_stats
         }
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(dataset, f, ensure_ascii=False, indent=2)
-        
-        return dataset['metadata']
+
+        # Пишем потоково: заголовок metadata одним dumps, затем записи по
+        # одной — в памяти держится сериализация одной записи, а не всего
+        # датасета
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(b'{"metadata":')
+            f.write(orjson.dumps(metadata))
+            f.write(b',"records":[')
+            for i, record in enumerate(records):
+                if i:
+                    f.write(b',')
+                f.write(orjson.dumps(record))
+            f.write(b']}\n')
+
+        return metadata
 
 
 if __name__ == "__main__":
@@ -4,73 +4,93 @@ Generator for VAK RB bibliography dataset.
 Creates 1000+ variations based on official patterns.
 """
 
-import json
+import operator
+import orjson
 import random
-from typing import List, Dict
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
+
+# Единый экземпляр RNG с закэшированными связанными методами: убирает
+# LOAD_ATTR по модулю random на каждый вызов в генераторах
+_R = random.Random()
+_choice = _R.choice
+_randint = _R.randint
+_rand = _R.random
+_choices = _R.choices
+_getrandbits = _R.getrandbits
+_shuffle = _R.shuffle
+
+
+def seed(a=None) -> None:
+    """Инициализирует RNG модуля (для воспроизводимой генерации)."""
+    _R.seed(a)
 
 # ============================================================================
 # DATA BANKS
 # ============================================================================
 
-SURNAMES_RU = [
+SURNAMES_RU = (
     "Иванов", "Петров", "Сидоров", "Козлов", "Новиков", "Федоров", "Смирнов",
     "Волков", "Кузнецов", "Соколов", "Попов", "Лебедев", "Морозов", "Павлов",
     "Семенов", "Голубев", "Виноградов", "Богданов", "Воробьев", "Михайлов",
     "Егоров", "Никитин", "Соловьев", "Яковлев", "Захаров", "Борисов", "Орлов",
     "Киселев", "Андреев", "Макаров", "Степанов", "Николаев", "Алексеев",
     "Григорьев", "Сергеев", "Романов", "Васильев", "Дмитриев", "Тимофеев"
-]
+)
 
-SURNAMES_BY = [
+SURNAMES_BY = (
     "Іваноў", "Казлоў", "Новік", "Кавалёў", "Петрыкаў", "Васілеўскі", "Каваленя",
     "Жылінскі", "Шыла", "Краўчанка", "Лукашэвіч", "Дубаневіч", "Багдановіч",
     "Купала", "Колас", "Машэра", "Скарына", "Гусоўскі", "Быкаў", "Караткевіч",
     "Адамовіч", "Гілевіч", "Танк", "Брыль", "Барадулін", "Верабей", "Грачыха",
     "Врублеўскі", "Аляхновіч", "Валатоўская", "Бараноўскі", "Ермакова"
-]
+)
 
-INITIALS = [
+INITIALS = (
     "А. В.", "И. П.", "С. Н.", "О. А.", "Н. М.", "В. И.", "Е. П.", "М. А.",
     "Д. В.", "К. С.", "Л. Ф.", "П. В.", "Р. Г.", "Т. А.", "Ю. С.", "Б. Н.",
     "Г. И.", "Ж. К.", "З. М.", "Э. Р.", "В. В.", "А. А.", "Н. Н.", "С. С.",
     "И. И.", "М. М.", "Д. А.", "Л. В.", "О. В.", "Е. А.", "А. Л.", "В. Ф."
-]
+)
 
-CITIES = [
+CITIES = (
     "Минск", "Мінск", "Мн.", "Гомель", "Брест", "Гродно", "Могилёв", "Витебск",
     "М.", "СПб.", "Москва", "Санкт-Петербург", "Киев", "Ростов н/Д", "Новосибирск"
-]
+)
 
-CITIES_BELARUS = ["Минск", "Мінск", "Мн.", "Гомель", "Брест", "Гродно", "Могилёв", "Витебск", "Горки"]
+# Белорусское подмножество выводится из канонического кортежа, чтобы обе
+# выборки разделяли одни и те же строковые объекты ("Горки" встречается
+# только в белорусских ссылках)
+CITIES_BELARUS = CITIES[:8] + ("Горки",)
 
-PUBLISHERS = [
+PUBLISHERS = (
     "Беларуская навука", "Бел. навука", "Вышэйшая школа", "БДУ", "БГУ", "БНТУ",
     "Юрайт", "Амалфея", "Аверсэв", "Народная асвета", "Право и экономика",
     "Голас Радзімы", "Медиал", "БГУИР", "ГрГМУ", "БрГУ", "ГГУ", "Колорград",
     "Экономэнерго", "Юнипак", "Госстандарт", "Белэнерго", "Ковчег", "Энергопресс",
     "Дашков и К°", "Наука-Спектр", "Лань", "Планета музыки", "ОИЯИ"
-]
+)
 
-PUBLISHERS_BELARUS = [
-    "Беларуская навука", "Бел. навука", "Вышэйшая школа", "БДУ", "БГУ", "БНТУ",
-    "Амалфея", "Аверсэв", "Народная асвета", "Право и экономика", "БГУИР",
-    "ГрГМУ", "БрГУ", "ГГУ", "Колорград", "Госстандарт", "Ковчег"
-]
+# Индексы белорусских издательств в каноническом кортеже PUBLISHERS
+_PUBLISHERS_BELARUS_IDX = (0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 13, 14, 15, 16, 17, 20, 22)
+PUBLISHERS_BELARUS = tuple(PUBLISHERS[i] for i in _PUBLISHERS_BELARUS_IDX)
 
-JOURNALS = [
+JOURNALS = (
     "Весці НАН Беларусі", "Вестник БГУ", "Вопросы экономики", "Нар. асвета",
     "Беларуская думка", "Журнал Белорусского государственного университета. Филология",
     "Весн. Віцеб. дзярж. ун-та", "Зб. навук. пр.", "Доклады НАН Беларуси",
     "Вестник БНТУ", "Белорус. экон. журн.", "Труды БГТУ", "Проблемы управления",
     "Информатика", "Математика и информатика", "Право.by", "Юстиция Беларуси"
-]
+)
 
-NEWSPAPERS = [
+NEWSPAPERS = (
     "Сельская газета", "Совет. Белоруссия", "Белорус. лес. газ.", "Рэспубліка",
     "Звязда", "Народная газета", "SB.BY. Беларусь сегодня", "Белорусская нива"
-]
+)
 
-ORGANIZATIONS = [
+ORGANIZATIONS = (
     "НАН Беларуси", "Белорус. гос. ун-т", "Бел. гос. ун-т", "БГУ",
     "Белорус. гос. ун-т информатики и радиоэлектроники", "БГУИР",
     "Бел. нац. техн. ун-т", "БНТУ", "Гомел. гос. ун-т", "ГГУ",
@@ -78,46 +98,46 @@ ORGANIZATIONS = [
     "Брест. гос. ун-т", "БрГУ", "Белорус. гос. пед. ун-т", "БГПУ",
     "Бел. гос. мед. ун-т", "БГМУ", "Бел. гос. с.-х. акад.",
     "Нац. центр правовой информ. Респ. Беларусь", "М-во юстиции Респ. Беларусь"
-]
+)
 
 # Book titles by domain
 BOOK_TITLES = {
-    "economics": [
+    "economics": (
         "Основы экономики", "Экономическая теория", "Макроэкономика", "Микроэкономика",
         "Финансовый менеджмент", "Инвестиционный анализ", "Бухгалтерский учет",
         "Ревизия и аудит", "Налоговое планирование", "Международная торговля",
         "Экономика предприятия", "Управление проектами", "Маркетинг"
-    ],
-    "law": [
+    ),
+    "law": (
         "Теория государства и права", "Конституционное право", "Гражданское право",
         "Уголовное право", "Административное право", "Трудовое право",
         "Международное право", "Финансовое право", "Налоговое право",
         "Экологическое право", "Семейное право", "Арбитражный процесс"
-    ],
-    "tech": [
+    ),
+    "tech": (
         "Информационные технологии", "Программирование", "Базы данных",
         "Компьютерные сети", "Искусственный интеллект", "Машинное обучение",
         "Кибербезопасность", "Веб-разработка", "Мобильные приложения",
         "Робототехника", "Системный анализ", "Автоматизация производства"
-    ],
-    "science": [
+    ),
+    "science": (
         "Методы исследования", "Математический анализ", "Теоретическая физика",
         "Органическая химия", "Молекулярная биология", "Генетика",
         "Экология", "Геология", "Астрономия", "Статистика"
-    ],
-    "humanities": [
+    ),
+    "humanities": (
         "История Беларуси", "Философия", "Социология", "Политология",
         "Культурология", "Психология", "Педагогика", "Лингвистика",
         "Литературоведение", "Искусствоведение", "Религиоведение"
-    ],
-    "medicine": [
+    ),
+    "medicine": (
         "Анатомия человека", "Физиология", "Терапия", "Хирургия",
         "Педиатрия", "Кардиология", "Неврология", "Онкология",
         "Фармакология", "Микробиология", "Иммунология"
-    ]
+    )
 }
 
-ARTICLE_TITLES = [
+ARTICLE_TITLES = (
     "Анализ данных в современных условиях",
     "Проблемы развития и перспективы",
     "Методологические подходы к исследованию",
@@ -133,27 +153,27 @@ ARTICLE_TITLES = [
     "Роль и значение в современных условиях",
     "Перспективы внедрения инноваций",
     "Комплексный подход к решению проблем"
-]
+)
 
-LAW_TITLES = [
+LAW_TITLES = (
     "О государственном регулировании", "Об охране окружающей среды",
     "О защите прав потребителей", "О предпринимательской деятельности",
     "О государственных закупках", "Об образовании", "О здравоохранении",
     "О социальной защите", "О труде и занятости", "О налогообложении",
     "О банках и банковской деятельности", "О ценных бумагах",
     "О местном управлении", "О государственной службе", "О безопасности"
-]
+)
 
-PATENT_TITLES = [
+PATENT_TITLES = (
     "Способ обработки материалов", "Устройство для измерения",
     "Метод определения содержания", "Способ получения композиции",
     "Устройство для автоматизации", "Способ очистки воды",
     "Метод анализа данных", "Устройство контроля параметров",
     "Способ синтеза соединений", "Устройство для диагностики",
     "Метод оптимизации процесса", "Способ защиты информации"
-]
+)
 
-DISSERTATION_TOPICS = [
+DISSERTATION_TOPICS = (
     "Развитие системы управления",
     "Совершенствование методов анализа",
     "Повышение эффективности процессов",
@@ -162,9 +182,9 @@ DISSERTATION_TOPICS = [
     "Моделирование социально-экономических систем",
     "Разработка инструментария оценки",
     "Исследование закономерностей развития"
-]
+)
 
-CONFERENCE_TITLES = [
+CONFERENCE_TITLES = (
     "Актуальные проблемы науки и образования",
     "Инновационные технологии в производстве",
     "Современные методы исследования",
@@ -173,95 +193,315 @@ CONFERENCE_TITLES = [
     "Компьютерные системы и сети",
     "Информационные технологии и управление",
     "Актуальные проблемы дизайна и дизайн-образования"
-]
+)
 
-SPECIALTY_CODES = [
+SPECIALTY_CODES = (
     "08.00.05", "08.00.01", "12.00.01", "12.00.03", "05.13.01", "05.13.06",
     "07.00.02", "07.00.09", "09.00.01", "10.01.01", "14.01.05", "14.00.27",
     "01.01.02", "01.04.07", "02.00.03", "03.02.08", "17.00.09", "13.00.01"
-]
-
-STANDARD_PREFIXES = ["ГОСТ", "СТБ", "ТКП", "СТБ ISO", "ГОСТ Р", "ТР ТС", "СТП"]
+)
+
+STANDARD_PREFIXES = ("ГОСТ", "СТБ", "ТКП", "СТБ ISO", "ГОСТ Р", "ТР ТС", "СТП")
+
+# Интернируем строки банков один раз при импорте: повторные вхождения в
+# сгенерированном корпусе разделяют один объект, хэширование и сравнение
+# при дедупликации сводятся к сравнению указателей
+for _name in ("SURNAMES_RU", "SURNAMES_BY", "INITIALS", "CITIES", "CITIES_BELARUS",
+              "PUBLISHERS", "PUBLISHERS_BELARUS", "JOURNALS", "NEWSPAPERS",
+              "ORGANIZATIONS", "ARTICLE_TITLES", "LAW_TITLES", "PATENT_TITLES",
+              "DISSERTATION_TOPICS", "CONFERENCE_TITLES", "SPECIALTY_CODES",
+              "STANDARD_PREFIXES"):
+    globals()[_name] = tuple(map(sys.intern, globals()[_name]))
+BOOK_TITLES = {k: tuple(map(sys.intern, v)) for k, v in BOOK_TITLES.items()}
+
+# Small literal banks hoisted out of the generators so each call indexes a
+# shared tuple instead of rebuilding the list
+
+_MONTHS_ABBR = ("янв.", "февр.", "марта", "апр.", "мая", "июня",
+                "июля", "авг.", "сент.", "окт.", "нояб.", "дек.")
+
+_PUB_TYPES = ("учеб. пособие", "учеб.-метод. пособие", "монография", "практикум", "")
+
+_EDITIONS = ("2-е изд.", "3-е изд.", "2-е изд., стер.", "Изд. 2-е", "2-е изд., перераб.")
+
+_COLLECTION_PREFIXES = ("Актуальные проблемы", "Современные вопросы", "Научные труды")
+_COLLECTION_SUBJECTS = ("науки", "экономики", "права", "образования")
+
+_LAW_TYPES = (
+    ("Закон Респ. Беларусь", "№"),
+    ("Декрет Президента Респ. Беларусь", "№"),
+    ("Указ Президента Респ. Беларусь", "№"),
+    ("постановление Совета Министров Респ. Беларусь", "№"),
+    ("приказ М-ва юстиции Респ. Беларусь", "№"),
+    ("постановление М-ва здравоохранения Респ. Беларусь", "№"),
+)
+
+_STANDARD_TITLES = (
+    "Система стандартов по информации",
+    "Общие технические требования",
+    "Методы испытаний",
+    "Правила приемки",
+    "Технические условия",
+    "Нормы проектирования"
+)
+_STANDARD_PUBLISHERS = ("Госстандарт", "Бел. гос. ин-т стандартизации и сертификации")
+
+_PATENT_TYPES = (
+    ("пат. BY", 10000, 99999),
+    ("а. с. SU", 100000, 999999),
+    ("полез. модель RU", 10000, 99999),
+    ("пат. RU", 1000000, 9999999),
+)
+
+_DEGREE_TYPES = (
+    ("дис. ... канд.", "канд."),
+    ("дис. ... д-ра", "д-ра"),
+    ("дыс. ... канд.", "канд."),  # Belarusian
+)
+_SCIENCE_TYPES = ("экон. наук", "юрид. наук", "техн. наук", "филол. наук",
+                  "ист. наук", "мед. наук", "пед. наук", "филос. наук")
+
+_CONF_TYPES = ("материалы", "сб. ст.", "тезисы докл.")
+_CONF_LEVELS = ("Междунар.", "Респ.", "регион.")
+_CONF_FORMS = ("науч. конф.", "науч.-практ. конф.",
+               "науч. конф. аспирантов, магистрантов и студентов")
+
+_E_RESOURCES = (
+    ("Национальный правовой Интернет-портал Республики Беларусь", "http://www.pravo.by"),
+    ("Официальный сайт Президента Республики Беларусь", "http://www.president.gov.by"),
+    ("Национальный статистический комитет Республики Беларусь", "http://www.belstat.gov.by"),
+    ("Министерство образования Республики Беларусь", "http://www.edu.gov.by"),
+    ("Научная электронная библиотека", "http://www.elibrary.ru"),
+    ("Электронная библиотека диссертаций", "http://www.dissercat.com"),
+)
+
+_MULTIMEDIA_TITLES = ("Симфония", "Концерт", "Музыкальные вечера", "Народные песни",
+                      "Классическая музыка", "Джазовые композиции")
+_MEDIA_TYPES = ("[Звукозапись]", "[Видеозапись]")
+_MEDIA_FORMATS = ("1 зв. диск", "1 CD-ROM", "1 DVD video", "1 диск")
+
+_MAP_REGIONS = ("Беларусь", "Европа", "Минская область", "Гомельская область",
+                "Брестская область", "Гродненская область")
+_MAP_TYPES = ("полит.-адм. карта", "физ. карта", "турист. карта", "автомоб. карта")
+_MAP_SCALES = ("1 : 500 000", "1 : 1 000 000", "1 : 2 500 000", "1 : 10 500 000")
+_MAP_PUBLISHERS = ("Белкартография", "АГТ Геоцентр", "Белгеодезия")
+
+_SCORE_TITLES = ("Романсы", "Сонаты", "Прелюдии", "Этюды", "Вальсы", "Полонезы", "Регтаймы")
+_INSTRUMENTS = ("для фортепиано", "для скрипки с фортепиано", "для тенора с фортепиано",
+                "для хора", "для оркестра")
+_SCORE_PUBLISHERS = ("Белорус. гос. акад. музыки", "Лань", "Планета музыки")
+
+_VISUAL_TITLES = ("С праздником!", "Поздравляем!", "9 мая. С праздником Победы!",
+                  "С Новым годом!", "Белорусские пейзажи")
+_VISUAL_TYPES = ("[плакат]", "[открытка]", "[репродукция]")
+_VISUAL_PUBLISHERS = ("Полиграфкомбинат им. Я. Коласа", "Нац. б-ка Беларуси", "Белпринт")
+
+_ARCHIVE_NAMES = (
+    "Архив суда Ленинского района г. Минска",
+    "Национальный архив Республики Беларусь",
+    "Архив Министерства внутренних дел Республики Беларусь",
+    "Государственный архив Минской области"
+)
+
+_DEP_ORGS = ("ИНИОН РАН", "ВИНИТИ", "БелИСА")
+
+_MULTIVOLUME_TITLES = ("Полное собрание сочинений", "Избранные труды", "Собрание сочинений",
+                       "Поўны збор твораў", "История Беларуси")
+
+_ABSTRACT_DEGREES = (
+    ("автореф. дис. ... канд.", "канд."),
+    ("автореф. дис. ... д-ра", "д-ра"),
+)
+_ABSTRACT_SCIENCES = ("экон. наук", "юрид. наук", "техн. наук", "мед. наук", "пед. наук")
+_FIRST_NAMES = ("Александр", "Елена", "Сергей", "Наталья", "Владимир", "Ольга")
+_PATRONYMICS = ("Викторович", "Александровна", "Николаевич", "Владимировна",
+                "Петрович", "Сергеевна")
+
+_CATALOG_TITLES = (
+    "Каталог инновационных разработок",
+    "Каталог древесных растений",
+    "Каталог продукции",
+    "Каталог научных изданий"
+)
+
+_GUIDE_TOPICS = ("Математика", "Физика", "Химия", "Программирование", "Экономика", "Право")
+_GUIDE_TYPES = ("метод. указания", "метод. рекомендации", "метод. пособие")
+_GUIDE_ACTIVITIES = ("к практ. занятиям", "к лаб. работам", "к курсовому проектированию",
+                     "к дипломному проектированию")
+
+# %-шаблоны сборки ссылок: один C-уровневый проход форматирования вместо
+# развёрнутого в байткод f-string на каждый вызов генератора
+
+_TPL_BOOK = "%s %s : %s / %s. – %s : %s, %d. – %d с."
+_TPL_BOOK_NO_PUBTYPE = "%s %s / %s. – %s : %s, %d. – %d с."
+_TPL_BOOK_EDITION = "%s %s : %s / %s. – %s. – %s : %s, %d. – %d с."
+_TPL_BOOK_NO_PUBTYPE_EDITION = "%s %s / %s. – %s. – %s : %s, %d. – %d с."
+_TPL_BOOK_4PLUS = "%s / %s %s [и др.]. – %s : %s, %d. – %d с."
+_TPL_JOURNAL_VOL = "%s %s / %s // %s. – %d. – Т. %d, № %d. – С. %d–%d."
+_TPL_JOURNAL = "%s %s / %s // %s. – %d. – № %d. – С. %d–%d."
+_TPL_COLLECTION = "%s %s / %s // %s : сб. науч. ст. / %s. – %s, %d. – С. %d–%d."
+_TPL_NEWSPAPER = "%s %s / %s // %s. – %d. – %d %s – С. %d–%d."
+_TPL_LAW_REESTR = ("%s : %s, %s, %s %d // Нац. реестр правовых актов Респ. Беларусь. "
+                   "– %d. – № %d. – Ст. %d.")
+_TPL_LAW_VEDAMASTSI = ("%s : %s, %s, %s %d-З // Ведамасцi Нац. сходу Рэсп. Беларусь. "
+                       "– %d. – № %d. – Арт. %d.")
+_TPL_LAW_SEPARATE = ("%s : утв. %s %s, %s %d. – Мн. : Нац. центр правовой информ. "
+                     "Респ. Беларусь, %d. – %d с.")
+_TPL_CONFERENCE = "%s : %s %s %s, %s, %s / %s. – %s : %s, %d. – %d с."
+_TPL_ERES_ACCESS = "%s [Электронный ресурс]. – Режим доступа: %s. – Дата доступа: %s."
+_TPL_ERES_URL = "%s : [сайт]. – Мн., 2003–2025. – URL: %s (дата обращения: %s)."
+_TPL_ARCHIVE_CASE = "%s за %d г. – Уголовное дело № %d/%s (%d)."
+_TPL_ARCHIVE_FOND = "%s. – Ф. %d. Оп. %d. Д. %d. Л. %d."
+_TPL_PREPRINT = "%s %s / %s. – %s : %s, %d. – %d с. – (Препринт / %s ; № %d)."
+_TPL_REVIEW = ("%s [Рецензия] / %s // %s. – %d. – № %d. – С. %d–%d. "
+               "– Рец. на кн.: %s / %s %s. – %s : %s, %d. – %d с.")
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+class _BatchSampler:
+    """Пакетный источник случайных значений
+
+    Пополняется блоками одним вызовом random.choices (C-уровень) вместо
+    отдельного обращения к RNG на каждое значение в цикле генерации.
+    """
+
+    def __init__(self, population, batch_size: int = 1024) -> None:
+        self._population = population
+        self._batch_size = batch_size
+        self._values: list = []
+
+    def next(self):
+        if not self._values:
+            self._values = _choices(self._population, k=self._batch_size)
+        return self._values.pop()
+
+
+_YEAR_POOL = _BatchSampler(range(2015, 2026))
+_PAGES_POOL = _BatchSampler(range(50, 601))
+_RANGE_LEN_POOL = _BatchSampler(range(3, 51))
+_VOLUME_POOL = _BatchSampler(range(1, 31))
+_ISSUE_POOL = _BatchSampler(range(1, 13))
+_DAY_POOL = _BatchSampler(range(1, 29))
+_MONTH_POOL = _BatchSampler(range(1, 13))
+_POOLS = (_YEAR_POOL, _PAGES_POOL, _RANGE_LEN_POOL, _VOLUME_POOL, _ISSUE_POOL,
+          _DAY_POOL, _MONTH_POOL)
+
+
+def _reset_rng(seed_val: int) -> None:
+    """Полный сброс состояния RNG: сид плюс очистка пакетных пулов."""
+    _R.seed(seed_val)
+    for pool in _POOLS:
+        pool._values.clear()
+
+
+# Пространство авторов крошечное (~2.3 тыс. комбинаций), поэтому все
+# 4-кортежи с готовыми формами отображения построены один раз при импорте
+_AUTHORS_RU = tuple(
+    (s, i, f"{s}, {i}", f"{i} {s}") for s in SURNAMES_RU for i in INITIALS
+)
+_AUTHORS_BY = tuple(
+    (s, i, f"{s}, {i}", f"{i} {s}") for s in SURNAMES_BY for i in INITIALS
+)
+# Объединённый пул: выбор автора — один вызов RNG. Кратности 224/117
+# выравнивают вес отдельного кортежа так, что доля русских авторов
+# остаётся ровно 70 % при разных размерах пулов (39 и 32 фамилии):
+# 224·1248 : 117·1024 = 7 : 3
+_AUTHORS_ALL = _AUTHORS_RU * 224 + _AUTHORS_BY * 117
+
+
 def random_author() -> tuple:
-    """Returns (surname, initials) for Russian or Belarusian author."""
-    if random.random() < 0.7:
-        surname = random.choice(SURNAMES_RU)
-    else:
-        surname = random.choice(SURNAMES_BY)
-    initials = random.choice(INITIALS)
-    return surname, initials
+    """Returns (surname, initials, "Фамилия, И. О.", "И. О. Фамилия")."""
+    return _choice(_AUTHORS_ALL)
+
+def _sample_authors_str(k: int) -> str:
+    """k авторов в форме "И. О. Фамилия" через запятую, без промежуточного списка."""
+    return ", ".join(_choice(_AUTHORS_ALL)[3] for _ in range(k))
 
 def random_year(start: int = 2015, end: int = 2025) -> int:
-    return random.randint(start, end)
+    if start == 2015 and end == 2025:
+        return _YEAR_POOL.next()
+    return _randint(start, end)
 
 def random_pages(min_p: int = 50, max_p: int = 600) -> int:
-    return random.randint(min_p, max_p)
+    if min_p == 50 and max_p == 600:
+        return _PAGES_POOL.next()
+    return _randint(min_p, max_p)
 
 def random_page_range(max_pages: int = 300) -> tuple:
-    start = random.randint(5, max_pages - 20)
-    end = start + random.randint(3, 50)
+    start = _randint(5, max_pages - 20)
+    end = start + _RANGE_LEN_POOL.next()
     return start, end
 
 def random_volume() -> int:
-    return random.randint(1, 30)
+    return _VOLUME_POOL.next()
 
 def random_issue() -> int:
-    return random.randint(1, 12)
+    return _ISSUE_POOL.next()
 
 def random_city(belarus_only: bool = False) -> str:
     if belarus_only:
-        return random.choice(CITIES_BELARUS)
-    return random.choice(CITIES)
+        return _choice(CITIES_BELARUS)
+    return _choice(CITIES)
 
 def random_publisher(belarus_only: bool = False) -> str:
     if belarus_only:
-        return random.choice(PUBLISHERS_BELARUS)
-    return random.choice(PUBLISHERS)
+        return _choice(PUBLISHERS_BELARUS)
+    return _choice(PUBLISHERS)
 
 def random_journal() -> str:
-    return random.choice(JOURNALS)
+    return _choice(JOURNALS)
 
 def random_organization() -> str:
-    return random.choice(ORGANIZATIONS)
+    return _choice(ORGANIZATIONS)
+
+# Форма "до первой точки с запятой" посчитана один раз для всех организаций
+_ORG_FIRST = tuple(o.split(';')[0].strip() for o in ORGANIZATIONS)
+
+def random_organization_first() -> str:
+    return _choice(_ORG_FIRST)
+
+# Готовые строковые формы дней и лет: random_date не конвертирует int в
+# строку и не приклеивает " г." на каждом вызове
+_DAY_STRS = tuple(str(i) for i in range(1, 29))
+_YEAR_STRS = {y: f"{y} г." for y in range(2000, 2026)}
 
 def random_date() -> str:
-    day = random.randint(1, 28)
-    month = random.choice(["янв.", "февр.", "марта", "апр.", "мая", "июня",
-                           "июля", "авг.", "сент.", "окт.", "нояб.", "дек."])
-    year = random_year()
-    return f"{day} {month} {year} г."
+    return f"{_DAY_STRS[_DAY_POOL.next() - 1]} {_choice(_MONTHS_ABBR)} {_YEAR_STRS[random_year()]}"
+
+def _random_date_bare() -> str:
+    """Как random_date, но без суффикса " г."."""
+    return f"{_DAY_STRS[_DAY_POOL.next() - 1]} {_choice(_MONTHS_ABBR)} {random_year()}"
 
 def random_date_short() -> str:
-    day = str(random.randint(1, 28)).zfill(2)
-    month = str(random.randint(1, 12)).zfill(2)
-    year = random_year()
-    return f"{day}.{month}.{year}"
+    return f"{_DAY_POOL.next():02d}.{_MONTH_POOL.next():02d}.{random_year()}"
+
+# Взвешенный пул фамилий (70 % русских / 30 % белорусских) и плоский пул
+# названий — частый путь без домена обходится без словаря вовсе
+_SURNAMES_WEIGHTED = SURNAMES_RU * 7 + SURNAMES_BY * 3
+_ALL_BOOK_TITLES_FLAT = tuple(t for titles in BOOK_TITLES.values() for t in titles)
 
 def random_book_title(domain: str = None) -> str:
-    if domain and domain in BOOK_TITLES:
-        return random.choice(BOOK_TITLES[domain])
-    domain = random.choice(list(BOOK_TITLES.keys()))
-    return random.choice(BOOK_TITLES[domain])
+    if domain is None:
+        return _choice(_ALL_BOOK_TITLES_FLAT)
+    pool = BOOK_TITLES.get(domain)
+    return _choice(pool) if pool is not None else _choice(_ALL_BOOK_TITLES_FLAT)
 
 def random_article_title() -> str:
-    return random.choice(ARTICLE_TITLES)
+    return _choice(ARTICLE_TITLES)
 
 def random_law_title() -> str:
-    return random.choice(LAW_TITLES)
+    return _choice(LAW_TITLES)
 
 def random_patent_title() -> str:
-    return random.choice(PATENT_TITLES)
+    return _choice(PATENT_TITLES)
 
 def random_dissertation_topic() -> str:
-    return random.choice(DISSERTATION_TOPICS)
+    return _choice(DISSERTATION_TOPICS)
 
 def random_conference_title() -> str:
-    return random.choice(CONFERENCE_TITLES)
+    return _choice(CONFERENCE_TITLES)
 
 # ============================================================================
 # GENERATORS FOR EACH TYPE
@@ -269,7 +509,7 @@ def random_conference_title() -> str:
 
 def generate_book_1_3_authors() -> str:
     """Книга 1-3 автора."""
-    num_authors = random.randint(1, 3)
+    num_authors = _randint(1, 3)
     authors = [random_author() for _ in range(num_authors)]
 
     # First author in inverted form
@@ -277,29 +517,77 @@ def generate_book_1_3_authors() -> str:
     title = random_book_title()
 
     # Type of publication
-    pub_types = ["учеб. пособие", "учеб.-метод. пособие", "монография", "практикум", ""]
-    pub_type = random.choice(pub_types)
+    pub_type = _choice(_PUB_TYPES)
 
     # All authors after slash
-    all_authors = ", ".join([f"{a[1]} {a[0]}" for a in authors])
+    all_authors = ", ".join([a[3] for a in authors])
 
     city = random_city(belarus_only=True)
     publisher = random_publisher(belarus_only=True)
     year = random_year()
     pages = random_pages()
 
-    # Build the reference
+    # Build the reference; the edition, when drawn, goes straight into its
+    # own template instead of being patched in with str.replace
+    if _rand() < 0.2:
+        edition = _choice(_EDITIONS)
+        if pub_type:
+            return _TPL_BOOK_EDITION % (first, title, pub_type, all_authors,
+                                        edition, city, publisher, year, pages)
+        return _TPL_BOOK_NO_PUBTYPE_EDITION % (first, title, all_authors,
+                                               edition, city, publisher, year, pages)
     if pub_type:
-        result = f"{first} {title} : {pub_type} / {all_authors}. – {city} : {publisher}, {year}. – {pages} с."
-    else:
-        result = f"{first} {title} / {all_authors}. – {city} : {publisher}, {year}. – {pages} с."
-
-    # Sometimes add edition
-    if random.random() < 0.2:
-        edition = random.choice(["2-е изд.", "3-е изд.", "2-е изд., стер.", "Изд. 2-е", "2-е изд., перераб."])
-        result = result.replace(f". – {city}", f". – {edition}. – {city}")
-
-    return result
+        return _TPL_BOOK % (first, title, pub_type, all_authors, city, publisher, year, pages)
+    return _TPL_BOOK_NO_PUBTYPE % (first, title, all_authors, city, publisher, year, pages)
+
+
+def generate_book_1_3_authors_bulk(n: int) -> List[str]:
+    """Книга 1-3 автора, пакетная генерация n ссылок.
+
+    Все случайные величины выбираются заранее блочными вызовами _choices
+    (C-уровень), после чего остаётся только плотный цикл сборки строк.
+    """
+    counts = _choices((1, 2, 3), k=n)
+    total = sum(counts)
+    surnames = _choices(_SURNAMES_WEIGHTED, k=total)
+    initials = _choices(INITIALS, k=total)
+    titles = _choices(_ALL_BOOK_TITLES_FLAT, k=n)
+    pub_types = _choices(_PUB_TYPES, k=n)
+    cities = _choices(CITIES_BELARUS, k=n)
+    publishers = _choices(PUBLISHERS_BELARUS, k=n)
+    years = _choices(range(2015, 2026), k=n)
+    pages = _choices(range(50, 601), k=n)
+    ed_flags = _choices((True, False), cum_weights=(2, 10), k=n)
+    editions = _choices(_EDITIONS, k=n)
+
+    results = []
+    append = results.append
+    pos = 0
+    for row in range(n):
+        k = counts[row]
+        first = f"{surnames[pos]}, {initials[pos]}"
+        all_authors = ", ".join(
+            f"{initials[pos + j]} {surnames[pos + j]}" for j in range(k)
+        )
+        pos += k
+        pub_type = pub_types[row]
+        if ed_flags[row]:
+            if pub_type:
+                append(_TPL_BOOK_EDITION % (first, titles[row], pub_type, all_authors,
+                                            editions[row], cities[row], publishers[row],
+                                            years[row], pages[row]))
+            else:
+                append(_TPL_BOOK_NO_PUBTYPE_EDITION % (first, titles[row], all_authors,
+                                                       editions[row], cities[row],
+                                                       publishers[row], years[row],
+                                                       pages[row]))
+        elif pub_type:
+            append(_TPL_BOOK % (first, titles[row], pub_type, all_authors, cities[row],
+                                publishers[row], years[row], pages[row]))
+        else:
+            append(_TPL_BOOK_NO_PUBTYPE % (first, titles[row], all_authors, cities[row],
+                                           publishers[row], years[row], pages[row]))
+    return results
 
 
 def generate_book_4plus_authors() -> str:
@@ -312,9 +600,8 @@ def generate_book_4plus_authors() -> str:
     year = random_year()
     pages = random_pages()
 
-    result = f"{title} / {first_author[1]} {first_author[0]} [и др.]. – {city} : {publisher}, {year}. – {pages} с."
-
-    return result
+    return _TPL_BOOK_4PLUS % (title, first_author[1], first_author[0],
+                              city, publisher, year, pages)
 
 
 def generate_journal_article() -> str:
@@ -323,86 +610,71 @@ def generate_journal_article() -> str:
     title = random_article_title()
     journal = random_journal()
     year = random_year()
-    vol = random_volume() if random.random() < 0.5 else None
+    vol = random_volume() if _getrandbits(1) else None
     issue = random_issue()
     start_p, end_p = random_page_range(200)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     if vol:
-        result = f"{first} {title} / {all_authors} // {journal}. – {year}. – Т. {vol}, № {issue}. – С. {start_p}–{end_p}."
-    else:
-        result = f"{first} {title} / {all_authors} // {journal}. – {year}. – № {issue}. – С. {start_p}–{end_p}."
-
-    return result
+        return _TPL_JOURNAL_VOL % (first, title, all_authors, journal, year,
+                                   vol, issue, start_p, end_p)
+    return _TPL_JOURNAL % (first, title, all_authors, journal, year,
+                           issue, start_p, end_p)
 
 
 def generate_collection_article() -> str:
     """Статья в сборнике."""
     author = random_author()
     title = random_article_title()
-    collection_title = f"{random.choice(['Актуальные проблемы', 'Современные вопросы', 'Научные труды'])} {random.choice(['науки', 'экономики', 'права', 'образования'])}"
+    collection_title = f"{_choice(_COLLECTION_PREFIXES)} {_choice(_COLLECTION_SUBJECTS)}"
 
     org = random_organization()
     city = random_city(belarus_only=True)
     year = random_year()
     start_p, end_p = random_page_range(300)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
-    result = f"{first} {title} / {all_authors} // {collection_title} : сб. науч. ст. / {org}. – {city}, {year}. – С. {start_p}–{end_p}."
-
-    return result
+    return _TPL_COLLECTION % (first, title, all_authors, collection_title,
+                              org, city, year, start_p, end_p)
 
 
 def generate_law() -> str:
     """Закон/нормативный акт."""
-    law_types = [
-        ("Закон Респ. Беларусь", "№"),
-        ("Декрет Президента Респ. Беларусь", "№"),
-        ("Указ Президента Респ. Беларусь", "№"),
-        ("постановление Совета Министров Респ. Беларусь", "№"),
-        ("приказ М-ва юстиции Респ. Беларусь", "№"),
-        ("постановление М-ва здравоохранения Респ. Беларусь", "№"),
-    ]
-
-    law_type, num_prefix = random.choice(law_types)
+    law_type, num_prefix = _choice(_LAW_TYPES)
     title = random_law_title()
-    date = random_date()
-    num = random.randint(1, 500)
-
-    # Various formats
-    formats = [
-        f"{title} : {law_type}, {date}, {num_prefix} {num} // Нац. реестр правовых актов Респ. Беларусь. – {random_year()}. – № {random_issue()}. – Ст. {random.randint(1, 500)}.",
-        f"{title} : {law_type}, {date}, {num_prefix} {num}-З // Ведамасцi Нац. сходу Рэсп. Беларусь. – {random_year()}. – № {random_issue()}. – Арт. {random.randint(100, 500)}.",
-        f"{title} : утв. {law_type.replace('Закон Респ. Беларусь', 'постановлением М-ва юстиции Респ. Беларусь')} {date.replace(' г.', '')}, {num_prefix} {num}. – Мн. : Нац. центр правовой информ. Респ. Беларусь, {random_year()}. – {random_pages(50, 200)} с.",
-    ]
-
-    return random.choice(formats)
+    num = _randint(1, 500)
+
+    # Pick the format first, then build only that string; the separate
+    # edition gets the date without " г." instead of stripping it afterwards
+    fmt = _randint(0, 2)
+    if fmt == 0:
+        return _TPL_LAW_REESTR % (title, law_type, random_date(), num_prefix, num,
+                                  random_year(), random_issue(), _randint(1, 500))
+    if fmt == 1:
+        return _TPL_LAW_VEDAMASTSI % (title, law_type, random_date(), num_prefix, num,
+                                      random_year(), random_issue(), _randint(100, 500))
+    law_type = law_type.replace('Закон Респ. Беларусь',
+                                'постановлением М-ва юстиции Респ. Беларусь')
+    return _TPL_LAW_SEPARATE % (title, law_type, _random_date_bare(), num_prefix,
+                                num, random_year(), random_pages(50, 200))
 
 
 def generate_standard() -> str:
     """Стандарт (ГОСТ, СТБ, ТКП)."""
-    prefix = random.choice(STANDARD_PREFIXES)
-    number = f"{random.randint(1, 9999)}-{random_year()}"
-
-    titles = [
-        "Система стандартов по информации",
-        "Общие технические требования",
-        "Методы испытаний",
-        "Правила приемки",
-        "Технические условия",
-        "Нормы проектирования"
-    ]
-    title = random.choice(titles)
+    prefix = _choice(STANDARD_PREFIXES)
+    number = f"{_randint(1, 9999)}-{random_year()}"
+
+    title = _choice(_STANDARD_TITLES)
 
     intro_date = random_date_short()
     city = random_city(belarus_only=True)
-    publisher = random.choice(["Госстандарт", "Бел. гос. ин-т стандартизации и сертификации"])
+    publisher = _choice(_STANDARD_PUBLISHERS)
     year = random_year()
-    pages = random.randint(3, 50)
+    pages = _randint(3, 50)
 
     result = f"{title} : {prefix} {number}. – Введ. {intro_date}. – {city} : {publisher}, {year}. – {pages} с."
 
@@ -412,18 +684,12 @@ def generate_standard() -> str:
 def generate_patent() -> str:
     """Патент."""
     title = random_patent_title()
-    patent_types = [
-        ("пат. BY", random.randint(10000, 99999)),
-        ("а. с. SU", random.randint(100000, 999999)),
-        ("полез. модель RU", random.randint(10000, 99999)),
-        ("пат. RU", random.randint(1000000, 9999999)),
-    ]
 
-    ptype, pnum = random.choice(patent_types)
+    # Сначала выбираем тип, затем тянем единственный нужный randint
+    ptype, lo, hi = _choice(_PATENT_TYPES)
+    pnum = _randint(lo, hi)
 
-    num_inventors = random.randint(1, 5)
-    inventors = [random_author() for _ in range(num_inventors)]
-    inventors_str = ", ".join([f"{a[1]} {a[0]}" for a in inventors])
+    inventors_str = _sample_authors_str(_randint(1, 5))
 
     pub_date = random_date_short()
 
@@ -437,24 +703,16 @@ def generate_dissertation() -> str:
     author = random_author()
     topic = random_dissertation_topic()
 
-    degree_types = [
-        ("дис. ... канд.", "канд."),
-        ("дис. ... д-ра", "д-ра"),
-        ("дыс. ... канд.", "канд."),  # Belarusian
-    ]
-    degree, _ = random.choice(degree_types)
-
-    science_types = ["экон. наук", "юрид. наук", "техн. наук", "филол. наук",
-                     "ист. наук", "мед. наук", "пед. наук", "филос. наук"]
-    science = random.choice(science_types)
+    degree, _ = _choice(_DEGREE_TYPES)
+    science = _choice(_SCIENCE_TYPES)
 
-    code = random.choice(SPECIALTY_CODES)
+    code = _choice(SPECIALTY_CODES)
     city = random_city(belarus_only=True)
     year = random_year()
-    pages = random.randint(120, 300)
+    pages = _randint(120, 300)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     result = f"{first} {topic} : {degree} {science} : {code} / {all_authors}. – {city}, {year}. – {pages} л."
 
@@ -465,22 +723,16 @@ def generate_conference() -> str:
     """Материалы конференции."""
     title = random_conference_title()
 
-    conf_types = ["материалы", "сб. ст.", "тезисы докл."]
-    conf_type = random.choice(conf_types)
-
-    conf_levels = ["Междунар.", "Респ.", "регион."]
-    conf_level = random.choice(conf_levels)
-
-    conf_forms = ["науч. конф.", "науч.-практ. конф.", "науч. конф. аспирантов, магистрантов и студентов"]
-    conf_form = random.choice(conf_forms)
+    conf_type = _choice(_CONF_TYPES)
+    conf_level = _choice(_CONF_LEVELS)
+    conf_form = _choice(_CONF_FORMS)
 
     city = random_city(belarus_only=True)
 
     # Date range
-    day1 = random.randint(1, 20)
-    day2 = day1 + random.randint(1, 5)
-    month = random.choice(["янв.", "февр.", "марта", "апр.", "мая", "июня",
-                           "июля", "авг.", "сент.", "окт.", "нояб.", "дек."])
+    day1 = _randint(1, 20)
+    day2 = day1 + _randint(1, 5)
+    month = _choice(_MONTHS_ABBR)
     year = random_year()
     date_str = f"{day1}–{day2} {month} {year} г."
 
@@ -488,67 +740,41 @@ def generate_conference() -> str:
     publisher = random_publisher(belarus_only=True)
     pages = random_pages(50, 500)
 
-    result = f"{title} : {conf_type} {conf_level} {conf_form}, {city}, {date_str} / {org}. – {city} : {publisher}, {year}. – {pages} с."
-
-    return result
+    return _TPL_CONFERENCE % (title, conf_type, conf_level, conf_form, city,
+                              date_str, org, city, publisher, year, pages)
 
 
 def generate_electronic_resource() -> str:
     """Электронный ресурс."""
-    titles = [
-        "Национальный правовой Интернет-портал Республики Беларусь",
-        "Официальный сайт Президента Республики Беларусь",
-        "Национальный статистический комитет Республики Беларусь",
-        "Министерство образования Республики Беларусь",
-        "Научная электронная библиотека",
-        "Электронная библиотека диссертаций"
-    ]
-
-    urls = [
-        "http://www.pravo.by",
-        "http://www.president.gov.by",
-        "http://www.belstat.gov.by",
-        "http://www.edu.gov.by",
-        "http://www.elibrary.ru",
-        "http://www.dissercat.com"
-    ]
-
-    idx = random.randint(0, len(titles) - 1)
-    title = titles[idx]
-    url = urls[idx]
+    title, url = _choice(_E_RESOURCES)
 
     date = random_date_short()
 
     # Two formats
-    if random.random() < 0.5:
-        result = f"{title} [Электронный ресурс]. – Режим доступа: {url}. – Дата доступа: {date}."
-    else:
-        result = f"{title} : [сайт]. – Мн., 2003–2025. – URL: {url} (дата обращения: {date})."
-
-    return result
+    if _getrandbits(1):
+        return _TPL_ERES_ACCESS % (title, url, date)
+    return _TPL_ERES_URL % (title, url, date)
 
 
 def generate_newspaper_article() -> str:
     """Газетная статья."""
     author = random_author()
     title = random_article_title()
-    newspaper = random.choice(NEWSPAPERS)
+    newspaper = _choice(NEWSPAPERS)
     year = random_year()
 
-    day = random.randint(1, 28)
-    month = random.choice(["янв.", "февр.", "марта", "апр.", "мая", "июня",
-                           "июля", "авг.", "сент.", "окт.", "нояб.", "дек."])
+    day = _DAY_POOL.next()
+    month = _choice(_MONTHS_ABBR)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     # Newspaper pages are typically 1-20
-    start_p = random.randint(1, 15)
-    end_p = start_p + random.randint(1, 5)
+    start_p = _randint(1, 15)
+    end_p = start_p + _randint(1, 5)
 
-    result = f"{first} {title} / {all_authors} // {newspaper}. – {year}. – {day} {month} – С. {start_p}–{end_p}."
-
-    return result
+    return _TPL_NEWSPAPER % (first, title, all_authors, newspaper, year,
+                             day, month, start_p, end_p)
 
 
 def generate_preprint() -> str:
@@ -556,40 +782,34 @@ def generate_preprint() -> str:
     author = random_author()
     title = random_article_title()
 
-    org = random_organization()
+    org_idx = _randint(0, len(ORGANIZATIONS) - 1)
+    org = ORGANIZATIONS[org_idx]
     city = random_city(belarus_only=True)
     year = random_year()
-    pages = random.randint(10, 30)
-    number = random.randint(1, 50)
+    pages = _randint(10, 30)
+    number = _randint(1, 50)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
-    result = f"{first} {title} / {all_authors}. – {city} : {org.split(';')[0].strip()}, {year}. – {pages} с. – (Препринт / {org} ; № {number})."
-
-    return result
+    return _TPL_PREPRINT % (first, title, all_authors, city,
+                            _ORG_FIRST[org_idx], year, pages, org, number)
 
 
 def generate_multimedia() -> str:
     """Звуко- или видеозапись."""
     author = random_author()
 
-    titles = ["Симфония", "Концерт", "Музыкальные вечера", "Народные песни",
-              "Классическая музыка", "Джазовые композиции"]
-    title = random.choice(titles)
-
-    media_types = ["[Звукозапись]", "[Видеозапись]"]
-    media_type = random.choice(media_types)
-
-    formats = ["1 зв. диск", "1 CD-ROM", "1 DVD video", "1 диск"]
-    media_format = random.choice(formats)
+    title = _choice(_MULTIMEDIA_TITLES)
+    media_type = _choice(_MEDIA_TYPES)
+    media_format = _choice(_MEDIA_FORMATS)
 
     city = random_city(belarus_only=True)
     publisher = random_publisher(belarus_only=True)
     year = random_year()
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     result = f"{first} {title} {media_type} / {all_authors}. – {city} : {publisher}, {year}. – {media_format}."
 
@@ -598,18 +818,12 @@ def generate_multimedia() -> str:
 
 def generate_map() -> str:
     """Карта."""
-    regions = ["Беларусь", "Европа", "Минская область", "Гомельская область",
-               "Брестская область", "Гродненская область"]
-    region = random.choice(regions)
-
-    map_types = ["полит.-адм. карта", "физ. карта", "турист. карта", "автомоб. карта"]
-    map_type = random.choice(map_types)
-
-    scales = ["1 : 500 000", "1 : 1 000 000", "1 : 2 500 000", "1 : 10 500 000"]
-    scale = random.choice(scales)
+    region = _choice(_MAP_REGIONS)
+    map_type = _choice(_MAP_TYPES)
+    scale = _choice(_MAP_SCALES)
 
     city = random_city(belarus_only=True)
-    publisher = random.choice(["Белкартография", "АГТ Геоцентр", "Белгеодезия"])
+    publisher = _choice(_MAP_PUBLISHERS)
     year = random_year()
 
     result = f"{region} [Карты] : [{map_type}]. – {scale}. – {city} : {publisher}, {year}. – 1 к."
@@ -621,20 +835,16 @@ def generate_music_score() -> str:
     """Ноты."""
     author = random_author()
 
-    titles = ["Романсы", "Сонаты", "Прелюдии", "Этюды", "Вальсы", "Полонезы", "Регтаймы"]
-    title = random.choice(titles)
-
-    instruments = ["для фортепиано", "для скрипки с фортепиано", "для тенора с фортепиано",
-                   "для хора", "для оркестра"]
-    instrument = random.choice(instruments)
+    title = _choice(_SCORE_TITLES)
+    instrument = _choice(_INSTRUMENTS)
 
     city = random_city(belarus_only=True)
-    publisher = random.choice(["Белорус. гос. акад. музыки", "Лань", "Планета музыки"])
+    publisher = _choice(_SCORE_PUBLISHERS)
     year = random_year()
-    pages = random.randint(20, 100)
+    pages = _randint(20, 100)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     result = f"{first} {title} [Ноты] : {instrument} / {all_authors}. – {city} : {publisher}, {year}. – {pages} с."
 
@@ -643,15 +853,11 @@ def generate_music_score() -> str:
 
 def generate_visual_material() -> str:
     """Изоматериал."""
-    titles = ["С праздником!", "Поздравляем!", "9 мая. С праздником Победы!",
-              "С Новым годом!", "Белорусские пейзажи"]
-    title = random.choice(titles)
-
-    material_types = ["[плакат]", "[открытка]", "[репродукция]"]
-    material_type = random.choice(material_types)
+    title = _choice(_VISUAL_TITLES)
+    material_type = _choice(_VISUAL_TYPES)
 
     city = random_city(belarus_only=True)
-    publisher = random.choice(["Полиграфкомбинат им. Я. Коласа", "Нац. б-ка Беларуси", "Белпринт"])
+    publisher = _choice(_VISUAL_PUBLISHERS)
     year = random_year()
 
     result = f"{title} : {material_type}. – {city} : {publisher}, {year}. – 1 л."
@@ -661,24 +867,17 @@ def generate_visual_material() -> str:
 
 def generate_archive() -> str:
     """Архивный материал."""
-    archive_types = [
-        "Архив суда Ленинского района г. Минска",
-        "Национальный архив Республики Беларусь",
-        "Архив Министерства внутренних дел Республики Беларусь",
-        "Государственный архив Минской области"
-    ]
-    archive = random.choice(archive_types)
+    archive = _choice(_ARCHIVE_NAMES)
 
     year = random_year(2000, 2020)
-    case_num = random.randint(1, 999)
-
-    # Different formats
-    formats = [
-        f"{archive} за {year} г. – Уголовное дело № {case_num}/{str(year)[2:]} ({random.randint(1, 20)}).",
-        f"{archive}. – Ф. {random.randint(1, 100)}. Оп. {random.randint(1, 10)}. Д. {random.randint(1, 100)}. Л. {random.randint(1, 300)}.",
-    ]
+    case_num = _randint(1, 999)
 
-    return random.choice(formats)
+    # Pick the format first, then build only that string
+    if _getrandbits(1):
+        return _TPL_ARCHIVE_CASE % (archive, year, case_num,
+                                    "%02d" % (year % 100), _randint(1, 20))
+    return _TPL_ARCHIVE_FOND % (archive, _randint(1, 100), _randint(1, 10),
+                                _randint(1, 100), _randint(1, 300))
 
 
 def generate_research_report() -> str:
@@ -688,15 +887,14 @@ def generate_research_report() -> str:
     org = random_organization()
     leader = random_author()
 
-    executors = [random_author() for _ in range(random.randint(2, 4))]
-    executors_str = ", ".join([f"{a[1]} {a[0]}" for a in executors])
+    executors_str = _sample_authors_str(_randint(2, 4))
 
     city = random_city(belarus_only=True)
     year = random_year()
-    pages = random.randint(50, 300)
-    gr_num = f"{random_year(2015, 2020)}{random.randint(1000, 9999)}"
+    pages = _randint(50, 300)
+    gr_num = f"{random_year(2015, 2020)}{_randint(1000, 9999)}"
 
-    result = f"{title} : отчет о НИР (заключ.) / {org} ; рук. {leader[1]} {leader[0]} ; исполн.: {executors_str}. – {city}, {year}. – {pages} с. – № ГР {gr_num}."
+    result = f"{title} : отчет о НИР (заключ.) / {org} ; рук. {leader[3]} ; исполн.: {executors_str}. – {city}, {year}. – {pages} с. – № ГР {gr_num}."
 
     return result
 
@@ -709,15 +907,14 @@ def generate_deposited() -> str:
     org = random_organization()
     city = random_city()
     year = random_year(2010, 2020)
-    pages = random.randint(10, 50)
+    pages = _randint(10, 50)
 
-    dep_orgs = ["ИНИОН РАН", "ВИНИТИ", "БелИСА"]
-    dep_org = random.choice(dep_orgs)
+    dep_org = _choice(_DEP_ORGS)
     dep_date = random_date_short()
-    dep_num = random.randint(50000, 70000)
+    dep_num = _randint(50000, 70000)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     result = f"{first} {title} / {all_authors} ; {org}. – {city}, {year}. – {pages} с. – Деп. в {dep_org} {dep_date}, № {dep_num}."
 
@@ -728,18 +925,16 @@ def generate_multivolume() -> str:
     """Многотомное издание."""
     author = random_author()
 
-    titles = ["Полное собрание сочинений", "Избранные труды", "Собрание сочинений",
-              "Поўны збор твораў", "История Беларуси"]
-    title = random.choice(titles)
+    title = _choice(_MULTIVOLUME_TITLES)
 
-    volumes = random.randint(2, 10)
+    volumes = _randint(2, 10)
     city = random_city(belarus_only=True)
     publisher = random_publisher(belarus_only=True)
     year_start = random_year(2010, 2020)
-    year_end = year_start + random.randint(1, 5)
+    year_end = year_start + _randint(1, 5)
 
-    first = f"{author[0]}, {author[1]}"
-    all_authors = f"{author[1]} {author[0]}"
+    first = author[2]
+    all_authors = author[3]
 
     result = f"{first} {title} : у {volumes} т. / {all_authors}. – {city} : {publisher}, {year_start}–{year_end}. – {volumes} т."
 
@@ -751,26 +946,20 @@ def generate_abstract() -> str:
     author = random_author()
     topic = random_dissertation_topic()
 
-    degree_types = [
-        ("автореф. дис. ... канд.", "канд."),
-        ("автореф. дис. ... д-ра", "д-ра"),
-    ]
-    degree, _ = random.choice(degree_types)
+    degree, _ = _choice(_ABSTRACT_DEGREES)
+    science = _choice(_ABSTRACT_SCIENCES)
 
-    science_types = ["экон. наук", "юрид. наук", "техн. наук", "мед. наук", "пед. наук"]
-    science = random.choice(science_types)
-
-    code = random.choice(SPECIALTY_CODES)
+    code = _choice(SPECIALTY_CODES)
 
     # Full name
-    full_name = f"{author[0]} {random.choice(['Александр', 'Елена', 'Сергей', 'Наталья', 'Владимир', 'Ольга'])} {random.choice(['Викторович', 'Александровна', 'Николаевич', 'Владимировна', 'Петрович', 'Сергеевна'])}"
+    full_name = f"{author[0]} {_choice(_FIRST_NAMES)} {_choice(_PATRONYMICS)}"
 
     org = random_organization()
     city = random_city(belarus_only=True)
     year = random_year()
-    pages = random.randint(20, 50)
+    pages = _randint(20, 50)
 
-    first = f"{author[0]}, {author[1]}"
+    first = author[2]
 
     result = f"{first} {topic} : {degree} {science} : {code} / {full_name} ; {org}. – {city}, {year}. – {pages} с."
 
@@ -789,35 +978,28 @@ def generate_review() -> str:
     issue = random_issue()
 
     # Reviews are short - typically 2-5 pages
-    start_p = random.randint(50, 150)
-    end_p = start_p + random.randint(2, 5)
+    start_p = _randint(50, 150)
+    end_p = start_p + _randint(2, 5)
 
     city = random_city(belarus_only=True)
     publisher = random_publisher(belarus_only=True)
-    book_year = year - random.randint(0, 2)
+    book_year = year - _randint(0, 2)
     book_pages = random_pages()
 
-    first = f"{reviewer[0]}, {reviewer[1]}"
-    all_reviewers = f"{reviewer[1]} {reviewer[0]}"
+    first = reviewer[2]
+    all_reviewers = reviewer[3]
 
-    result = f"{first} [Рецензия] / {all_reviewers} // {journal}. – {year}. – № {issue}. – С. {start_p}–{end_p}. – Рец. на кн.: {reviewed_title} / {reviewed_author[1]} {reviewed_author[0]}. – {city} : {publisher}, {book_year}. – {book_pages} с."
-
-    return result
+    return _TPL_REVIEW % (first, all_reviewers, journal, year, issue, start_p, end_p,
+                          reviewed_title, reviewed_author[1], reviewed_author[0],
+                          city, publisher, book_year, book_pages)
 
 
 def generate_catalog() -> str:
     """Каталог."""
-    titles = [
-        "Каталог инновационных разработок",
-        "Каталог древесных растений",
-        "Каталог продукции",
-        "Каталог научных изданий"
-    ]
-    title = random.choice(titles)
+    title = _choice(_CATALOG_TITLES)
 
     org = random_organization()
-    compilers = [random_author() for _ in range(random.randint(1, 2))]
-    compilers_str = ", ".join([f"{a[1]} {a[0]}" for a in compilers])
+    compilers_str = _sample_authors_str(_randint(1, 2))
 
     editor = random_author()
     city = random_city(belarus_only=True)
@@ -825,154 +1007,219 @@ def generate_catalog() -> str:
     year = random_year()
     pages = random_pages(100, 500)
 
-    result = f"{title} / {org} ; сост.: {compilers_str} ; отв. ред. {editor[1]} {editor[0]}. – {city} : {publisher}, {year}. – {pages} с."
+    result = f"{title} / {org} ; сост.: {compilers_str} ; отв. ред. {editor[3]}. – {city} : {publisher}, {year}. – {pages} с."
 
     return result
 
 
 def generate_methodical_guide() -> str:
     """Методические указания."""
-    topics = ["Математика", "Физика", "Химия", "Программирование", "Экономика", "Право"]
-    topic = random.choice(topics)
-
-    guide_types = ["метод. указания", "метод. рекомендации", "метод. пособие"]
-    guide_type = random.choice(guide_types)
-
-    activities = ["к практ. занятиям", "к лаб. работам", "к курсовому проектированию",
-                  "к дипломному проектированию"]
-    activity = random.choice(activities)
+    topic = _choice(_GUIDE_TOPICS)
+    guide_type = _choice(_GUIDE_TYPES)
+    activity = _choice(_GUIDE_ACTIVITIES)
 
-    org = random_organization()
+    org_idx = _randint(0, len(ORGANIZATIONS) - 1)
+    org = ORGANIZATIONS[org_idx]
     compiler = random_author()
     city = random_city(belarus_only=True)
-    publisher = random.choice([org.split(';')[0].strip(), random_publisher(belarus_only=True)])
+    if _getrandbits(1):
+        publisher = _ORG_FIRST[org_idx]
+    else:
+        publisher = random_publisher(belarus_only=True)
     year = random_year()
-    pages = random.randint(20, 80)
+    pages = _randint(20, 80)
 
-    result = f"{topic} : {guide_type} {activity} / {org} ; сост. {compiler[1]} {compiler[0]}. – {city} : {publisher}, {year}. – {pages} с."
+    result = f"{topic} : {guide_type} {activity} / {org} ; сост. {compiler[3]}. – {city} : {publisher}, {year}. – {pages} с."
 
     return result
 
 
+def generate_many(kind: str, n: int) -> List[str]:
+    """Пакетная генерация n ссылок одного типа."""
+    if kind == 'book_1_3_authors':
+        return generate_book_1_3_authors_bulk(n)
+    gen = _GENERATORS[kind]
+    return [gen() for _ in range(n)]
+
+
 # ============================================================================
 # MAIN GENERATION
 # ============================================================================
 
-def validate_punctuation(text: str) -> str:
-    """Validate and fix common punctuation issues."""
-    import re
-
-    # Fix ". –X" -> ". – X" (space after dash, but not in ranges)
-    # First, protect ranges like "45–52", "2020–2024"
-    range_pattern = re.compile(r'(\d+)–(\d+)')
-    ranges = range_pattern.findall(text)
+# Все правила пунктуации слиты в одну альтернацию (как в cleanup_dataset):
+# строка сканируется один раз C-движком re, _vp_dispatch выбирает замену
+# по сработавшей ветке
+_VP_MASTER = re.compile(
+    # Диапазоны "45 – 52" -> "45–52" (включая "С. X – Y")
+    r'(?P<range>(?P<r_a>\d) *– *(?P<r_b>\d))'
+    # ". –X" -> ". – X" (пробел после тире, кроме цифр)
+    r'|(?P<dash>\. +–(?=[^\s\d]))'
+    # ":X" -> ": X" (но не в URL вида http://)
+    r'|(?P<colon>:(?=[^\s/]))'
+    # "И. О.Слово" -> "И. О. Слово" (явный класс букв вместо \w,
+    # чтобы не дёргать юникодную классификацию на каждый символ)
+    r'|(?P<init>[A-Za-zА-ЯЁа-яё]\. [A-Za-zА-ЯЁа-яё]\.)(?=[А-ЯЁа-яёA-Za-z])'
+)
+
+
+def _vp_dispatch(m: re.Match) -> str:
+    if m.group('range') is not None:
+        return f"{m.group('r_a')}–{m.group('r_b')}"
+    if m.group('dash') is not None:
+        return '. – '
+    if m.group('colon') is not None:
+        return ': '
+    return m.group('init') + ' '
 
-    # Fix missing space after dash in non-range contexts
-    text = re.sub(r'\. –([^\s\d])', r'. – \1', text)
-    text = re.sub(r'\. – (\d)', lambda m: f'. – {m.group(1)}' if not re.match(r'^\d+–\d+', text[m.end()-1:m.end()+10]) else m.group(0), text)
 
-    # Fix ":X" -> ": X"
-    text = re.sub(r':([^\s/])', r': \1', text)
-
-    # Fix double spaces
-    text = re.sub(r'  +', ' ', text)
-
-    # Fix "И. О.Слово" -> "И. О. Слово"
-    text = re.sub(r'(\w\. \w\.)([А-ЯЁа-яёA-Za-z])', r'\1 \2', text)
-
-    # Ensure no space around dash in ranges
-    text = re.sub(r'(\d) – (\d)', r'\1–\2', text)
-    text = re.sub(r'(\d)– (\d)', r'\1–\2', text)
-    text = re.sub(r'(\d) –(\d)', r'\1–\2', text)
+def validate_punctuation(text: str) -> str:
+    """Validate and fix common punctuation issues.
+
+    Один проход C-уровневого сканера вместо питоновского цикла по
+    символам: альтернация находит первое применимое правило, диспетчер
+    подставляет замену. Двойные пробелы (фиксированная строка)
+    схлопываются заранее C-уровневым str.replace, как в cleanup_dataset.
+    """
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return _VP_MASTER.sub(_vp_dispatch, text)
+
+
+_BATCH_SEP = '\x1f'
+
+
+def validate_punctuation_batch(texts: List[str]) -> List[str]:
+    """Чистит блок примеров одним вызовом сканера по склейке.
+
+    Накладные расходы движка re платятся один раз на блок, а не на
+    пример. Разделитель \x1f не входит ни в один символьный класс
+    правил, поэтому ни одно правило не пересекает границу примеров.
+    """
+    if not texts:
+        return []
+    blob = _BATCH_SEP.join(texts)
+    while '  ' in blob:
+        blob = blob.replace('  ', ' ')
+    cleaned = _VP_MASTER.sub(_vp_dispatch, blob).split(_BATCH_SEP)
+    if len(cleaned) != len(texts):
+        # Страховка на случай разделителя в самом тексте
+        return [validate_punctuation(t) for t in texts]
+    return cleaned
+
+
+# Distribution of types
+_DISTRIBUTION = {
+    'law': 180,
+    'book_1_3_authors': 160,
+    'journal_article': 120,
+    'collection_article': 80,
+    'book_4plus_authors': 70,
+    'standard': 60,
+    'conference': 50,
+    'multimedia': 50,
+    'patent': 40,
+    'dissertation': 30,
+    'electronic_resource': 30,
+    'newspaper_article': 30,
+    'preprint': 20,
+    'map': 20,
+    'music_score': 20,
+    'visual_material': 20,
+    'archive': 20,
+    'research_report': 15,
+    'deposited': 15,
+    'multivolume': 15,
+    'abstract': 15,
+    'review': 15,
+    'catalog': 10,
+    'methodical_guide': 15,
+}
 
-    # Fix "С. X – Y" -> "С. X–Y"
-    text = re.sub(r'С\. (\d+) ?– ?(\d+)', r'С. \1–\2', text)
+_GENERATORS = {
+    'law': generate_law,
+    'book_1_3_authors': generate_book_1_3_authors,
+    'journal_article': generate_journal_article,
+    'collection_article': generate_collection_article,
+    'book_4plus_authors': generate_book_4plus_authors,
+    'standard': generate_standard,
+    'conference': generate_conference,
+    'multimedia': generate_multimedia,
+    'patent': generate_patent,
+    'dissertation': generate_dissertation,
+    'electronic_resource': generate_electronic_resource,
+    'newspaper_article': generate_newspaper_article,
+    'preprint': generate_preprint,
+    'map': generate_map,
+    'music_score': generate_music_score,
+    'visual_material': generate_visual_material,
+    'archive': generate_archive,
+    'research_report': generate_research_report,
+    'deposited': generate_deposited,
+    'multivolume': generate_multivolume,
+    'abstract': generate_abstract,
+    'review': generate_review,
+    'catalog': generate_catalog,
+    'methodical_guide': generate_methodical_guide,
+}
 
-    return text
+# Размер блока примеров на одну задачу пула
+_BLOCK = 64
+
+
+def _gen_block(args: Tuple[str, int, int]) -> List[Dict]:
+    """Работник пула: блок примеров одного типа с собственным сидом."""
+    entry_type, count, seed_val = args
+    _reset_rng(seed_val)
+    generator = _GENERATORS[entry_type]
+    try:
+        # Горячий путь без обработчика исключений на каждой итерации
+        raws = [generator() for _ in range(count)]
+    except Exception:
+        # Редкий путь: повторяем поштучно, пропуская сбойные примеры
+        raws = []
+        append = raws.append
+        for _ in range(count):
+            try:
+                append(generator())
+            except Exception as e:
+                print(f"Error generating {entry_type}: {e}")
+    # Словари материализуются один раз, уже по очищенным текстам
+    return [{'type': entry_type, 'example': text}
+            for text in validate_punctuation_batch(raws)]
 
 
 def generate_dataset(target_count: int = 1100) -> Dict:
     """Generate the complete dataset."""
 
-    # Distribution of types
-    distribution = {
-        'law': 180,
-        'book_1_3_authors': 160,
-        'journal_article': 120,
-        'collection_article': 80,
-        'book_4plus_authors': 70,
-        'standard': 60,
-        'conference': 50,
-        'multimedia': 50,
-        'patent': 40,
-        'dissertation': 30,
-        'electronic_resource': 30,
-        'newspaper_article': 30,
-        'preprint': 20,
-        'map': 20,
-        'music_score': 20,
-        'visual_material': 20,
-        'archive': 20,
-        'research_report': 15,
-        'deposited': 15,
-        'multivolume': 15,
-        'abstract': 15,
-        'review': 15,
-        'catalog': 10,
-        'methodical_guide': 15,
-    }
-
-    generators = {
-        'law': generate_law,
-        'book_1_3_authors': generate_book_1_3_authors,
-        'journal_article': generate_journal_article,
-        'collection_article': generate_collection_article,
-        'book_4plus_authors': generate_book_4plus_authors,
-        'standard': generate_standard,
-        'conference': generate_conference,
-        'multimedia': generate_multimedia,
-        'patent': generate_patent,
-        'dissertation': generate_dissertation,
-        'electronic_resource': generate_electronic_resource,
-        'newspaper_article': generate_newspaper_article,
-        'preprint': generate_preprint,
-        'map': generate_map,
-        'music_score': generate_music_score,
-        'visual_material': generate_visual_material,
-        'archive': generate_archive,
-        'research_report': generate_research_report,
-        'deposited': generate_deposited,
-        'multivolume': generate_multivolume,
-        'abstract': generate_abstract,
-        'review': generate_review,
-        'catalog': generate_catalog,
-        'methodical_guide': generate_methodical_guide,
-    }
-
-    examples = []
-
-    for entry_type, count in distribution.items():
-        generator = generators[entry_type]
-        for _ in range(count):
-            try:
-                text = generator()
-                text = validate_punctuation(text)
-                examples.append({
-                    'type': entry_type,
-                    'example': text
-                })
-            except Exception as e:
-                print(f"Error generating {entry_type}: {e}")
+    # Блоки независимы и детерминированы своим сидом, поэтому порядок
+    # исполнения в пуле не влияет на результат
+    tasks = []
+    for entry_type, count in _DISTRIBUTION.items():
+        for offset in range(0, count, _BLOCK):
+            n = min(_BLOCK, count - offset)
+            tasks.append((entry_type, n, _R.randrange(2 ** 32)))
+
+    # Итоговый список известного размера: блоки пишутся срезами без
+    # промежуточных реаллокаций
+    total = sum(_DISTRIBUTION.values())
+    examples = [None] * total
+    idx = 0
+    with ProcessPoolExecutor() as executor:
+        for block in executor.map(_gen_block, tasks):
+            examples[idx:idx + len(block)] = block
+            idx += len(block)
+    if idx != total:  # часть примеров могла быть пропущена из-за ошибок
+        del examples[idx:]
 
     # Shuffle
-    random.shuffle(examples)
+    _shuffle(examples)
 
     return {
         'description': 'Датасет для обучения форматированию библиографии ВАК РБ',
         'source': 'Generated based on vak.gov.by patterns',
         'generated_at': '2026-01-20',
         'total_examples': len(examples),
-        'type_distribution': {k: v for k, v in distribution.items()},
+        'type_distribution': {k: v for k, v in _DISTRIBUTION.items()},
         'examples': examples
     }
 
@@ -980,22 +1227,31 @@ def generate_dataset(target_count: int = 1100) -> Dict:
 if __name__ == '__main__':
     print("Generating VAK RB bibliography dataset...")
 
-    random.seed(42)  # For reproducibility
+    seed(42)  # For reproducibility
     dataset = generate_dataset(1100)
 
     output_file = 'vak_training.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(dataset, f, ensure_ascii=False, indent=2)
+    # Потоковая запись (как в dataset_expander.save): сериализуем примеры
+    # по одному, не строя весь JSON-буфер в памяти
+    with open(output_file, 'wb', buffering=1 << 20) as f:
+        f.write(b'{"description":' + orjson.dumps(dataset['description']))
+        f.write(b',"source":' + orjson.dumps(dataset['source']))
+        f.write(b',"generated_at":' + orjson.dumps(dataset['generated_at']))
+        f.write(b',"total_examples":' + orjson.dumps(dataset['total_examples']))
+        f.write(b',"type_distribution":' + orjson.dumps(dataset['type_distribution']))
+        f.write(b',"examples":[')
+        for i, ex in enumerate(dataset['examples']):
+            if i:
+                f.write(b',')
+            f.write(orjson.dumps(ex))
+        f.write(b']}\n')
 
     print(f"Generated {dataset['total_examples']} examples")
     print(f"Saved to {output_file}")
 
-    # Print type distribution
+    # Print type distribution (уже посчитано в generate_dataset)
     print("\nType distribution:")
-    type_counts = {}
-    for ex in dataset['examples']:
-        t = ex['type']
-        type_counts[t] = type_counts.get(t, 0) + 1
+    type_counts = dataset['type_distribution']
 
-    for t, c in sorted(type_counts.items(), key=lambda x: -x[1]):
+    for t, c in sorted(type_counts.items(), key=operator.itemgetter(1), reverse=True):
         print(f"  {t}: {c}")